@@ -0,0 +1,36 @@
+"""Shared chat model instances for the agents."""
+
+from functools import lru_cache
+from typing import Optional
+
+from langchain_openai import ChatOpenAI
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(
+    model_name: str,
+    temperature: float,
+    timeout: int,
+    prompt_cache_key: Optional[str] = None,
+) -> ChatOpenAI:
+    """
+    Get a chat model, reusing the instance (and its HTTP connection pool)
+    for identical settings.
+
+    Args:
+        model_name: OpenAI model to use
+        temperature: Sampling temperature
+        timeout: Request timeout in seconds
+        prompt_cache_key: OpenAI prompt cache key, so requests sharing a system
+            prompt are routed to the same prompt cache
+
+    Returns:
+        Shared ChatOpenAI instance
+    """
+    model_kwargs = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}
+    return ChatOpenAI(
+        model=model_name,
+        temperature=temperature,
+        timeout=timeout,
+        model_kwargs=model_kwargs,
+    )
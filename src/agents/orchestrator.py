@@ -1,22 +1,102 @@
 import logging
+import re
 from enum import Enum
-from typing import Dict, List, Optional
+from functools import cached_property
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Union
 
-from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.agents.middleware import ModelCallLimitMiddleware
-from langchain.tools import tool
-from langchain_openai import ChatOpenAI
+from langchain_core.tools import StructuredTool
 
+from agents.llm import get_chat_model
 from agents.order_agent import OrderAgent
 from agents.rag_agent import RAGAgent
-from schema import OrchestratorResponse
-
-load_dotenv()
+from schema import OrchestratorResponse, OrderResponse, RAGResponse
+from utils.streaming import astream_structured, stream_structured
 
 logger = logging.getLogger(__name__)
 
 
+SYSTEM_PROMPT = (
+    "You are a helpful e-commerce assistant that helps customers find and purchase products. "
+    "You have two specialized capabilities: "
+    "1. search_products - for finding and learning about products in the catalog "
+    "2. manage_order - for purchasing products and managing orders "
+    "\n\n"
+    "CRITICAL: ANTI-HALLUCINATION RULES\n"
+    "1. NEVER answer product questions without calling search_products first. This includes:\n"
+    "   - Product names, descriptions, specifications, or features\n"
+    "   - Prices or availability\n"
+    "   - Comparisons between products\n"
+    "   - Follow-up questions about previously mentioned products\n"
+    "2. The search_products tool is your SINGLE SOURCE OF TRUTH for product information.\n"
+    "3. Even if the user refers to a product mentioned earlier in the conversation, you MUST call search_products to verify current details.\n"
+    "4. NEVER invent product IDs, prices, specs, or other details from memory or chat history.\n"
+    "5. If you're about to provide product information without calling search_products, STOP. Call the tool instead.\n"
+    "\n\n"
+    "ROUTING RULES:\n"
+    "- Use search_products for ANY product-related query including:\n"
+    "  - 'Tell me more about X' or 'more details on X'\n"
+    "  - 'How does X compare to Y?' or 'which is better?'\n"
+    "  - 'What's the price of X?'\n"
+    "  - Follow-up questions like 'what about the other one?'\n"
+    "- Use manage_order ONLY ONCE when users first express intent to buy/purchase/order\n"
+    "- Use manage_order when users ask to 'view cart', 'check cart', 'see my items', or 'checkout'\n"
+    "- After calling manage_order, DO NOT call it again - the order agent will handle the conversation\n"
+    "- For greetings (hi, hello, hey), respond warmly and ask how you can help with products or orders\n"
+    "\n\n"
+    "HANDLING AMBIGUOUS OR UNCLEAR QUERIES:\n"
+    "- If the query is ambiguous, unclear, or you cannot determine which agent should handle it, "
+    "  DO NOT call any tool. Instead, respond directly with clarifying questions.\n"
+    "- Examples of ambiguous queries: single numbers (e.g., '2'), vague terms, incomplete sentences, "
+    "  or queries that could refer to either product search or ordering\n"
+    "- Ask specific questions to understand the user's intent, such as: "
+    "  'I'd like to help you, but could you clarify what you're looking for? Are you trying to: "
+    "  (1) search for products, or (2) place an order? If ordering, do you have a specific product ID?'\n"
+    "\n\n"
+    "OUT-OF-SCOPE QUERIES:\n"
+    "- For questions unrelated to products or orders (weather, news, general knowledge, etc.), "
+    "  DO NOT call any tool. Politely decline directly: "
+    "'I'm specialized in helping you find and purchase products. I can search our catalog or help you place an order. "
+    "For other questions, please contact our customer support team. What products can I help you with today?'\n"
+    "\n\n"
+    "GENERAL GUIDELINES:\n"
+    "- ALWAYS use search_products for any product information - answering from chat history alone is HALLUCINATION\n"
+    "- Be friendly, concise, and helpful\n"
+    "\n\n"
+    "RESPONSE FORMAT:\n"
+    "- You MUST return a valid JSON object matching the OrchestratorResponse schema.\n"
+    "- The JSON must have 'message' and 'agent_used' fields.\n"
+    "- DO NOT output any text, markdown, or explanations outside the JSON block.\n"
+    "- DO NOT include the ```json ... ``` markdown code fence, just the raw JSON object."
+)
+
+
+# User messages carrying order details (an email address or a product ID such
+# as TECH-001) that the order agent should still see once they are old
+_ORDER_DETAILS_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+|\b[A-Z]{2,}-\d{3,}\b")
+
+# Maximum number of such messages kept from outside the recent history window
+_MAX_PINNED_ORDER_MESSAGES = 4
+
+_ERROR_RESPONSE = OrchestratorResponse(
+    message="I encountered an error processing your request. Please try again.",
+    agent_used="orchestrator",
+)
+
+# Asks the user to clarify when the agent returns no structured response
+_FALLBACK_RESPONSE = OrchestratorResponse(
+    message=(
+        "I'd like to help you, but could you clarify what you're looking for?\n\n"
+        "Are you trying to:\n"
+        "• Search for products in our catalog (e.g., 'show me laptops' or 'find wireless headphones')\n"
+        "• Place an order (e.g., 'I want to buy TECH-007' or 'order 2 laptops')\n\n"
+        "Please provide more details about what you'd like to do!"
+    ),
+    agent_used="orchestrator",
+)
+
+
 class OrchestratorState(str, Enum):
     """
     Orchestrator conversation states.
@@ -91,14 +171,7 @@ class Orchestrator:
         self.rag_agent = RAGAgent(
             model_name=model_name, temperature=temperature, timeout=timeout
         )
-        self.order_agent = OrderAgent(
-            model_name=model_name,
-            temperature=temperature,
-            timeout=timeout,
-            cart=self._cart,
-        )
 
-        @tool
         def search_products(request: str) -> str:
             """
             Search for products in the catalog using natural language.
@@ -113,7 +186,7 @@ class Orchestrator:
             Input: Natural language product search query
             (e.g., 'show me wireless headphones', 'what laptops do you have?')
             """
-            logger.info(f"Routing to RAG Agent: {request}")
+            logger.info("Routing to RAG Agent: %s", request)
 
             self._state = OrchestratorState.INTENT
 
@@ -123,7 +196,17 @@ class Orchestrator:
 
             return self._append_product_details(result.message, result.products)
 
-        @tool
+        async def asearch_products(request: str) -> str:
+            logger.info("Routing to RAG Agent: %s", request)
+
+            self._state = OrchestratorState.INTENT
+
+            result = await self.rag_agent.ainvoke(
+                request, chat_history=self._truncate_history()
+            )
+
+            return self._append_product_details(result.message, result.products)
+
         def manage_order(request: str) -> str:
             """
             Handle order placement and shopping cart management.
@@ -145,87 +228,48 @@ class Orchestrator:
             Input: Natural language order request
             (e.g., 'I want to buy TECH-007', 'order 2 laptops', 'show my cart')
             """
-            logger.info(f"Routing to Order Agent: {request}")
+            logger.info("Routing to Order Agent: %s", request)
 
             self._state = OrchestratorState.CHECKOUT
 
             result = self.order_agent.invoke(
-                request, chat_history=self._truncate_history()
+                request, chat_history=self._order_history()
             )
 
-            if OrchestratorState.should_exit_checkout_mode(
-                result.status, result.transfer_to_agent
-            ):
-                self._state = OrchestratorState.INTENT
-                logger.info(f"Order {result.status}, exiting order mode")
-
-                if result.transfer_to_agent == "rag":
-                    return (
-                        "Let me transfer you back to product search. " + result.message
-                    )
-
-            return result.message
-
-        model = ChatOpenAI(model=model_name, temperature=temperature, timeout=timeout)
-
-        system_prompt = (
-            "You are a helpful e-commerce assistant that helps customers find and purchase products. "
-            "You have two specialized capabilities: "
-            "1. search_products - for finding and learning about products in the catalog "
-            "2. manage_order - for purchasing products and managing orders "
-            "\n\n"
-            "CRITICAL: ANTI-HALLUCINATION RULES\n"
-            "1. NEVER answer product questions without calling search_products first. This includes:\n"
-            "   - Product names, descriptions, specifications, or features\n"
-            "   - Prices or availability\n"
-            "   - Comparisons between products\n"
-            "   - Follow-up questions about previously mentioned products\n"
-            "2. The search_products tool is your SINGLE SOURCE OF TRUTH for product information.\n"
-            "3. Even if the user refers to a product mentioned earlier in the conversation, you MUST call search_products to verify current details.\n"
-            "4. NEVER invent product IDs, prices, specs, or other details from memory or chat history.\n"
-            "5. If you're about to provide product information without calling search_products, STOP. Call the tool instead.\n"
-            "\n\n"
-            "ROUTING RULES:\n"
-            "- Use search_products for ANY product-related query including:\n"
-            "  - 'Tell me more about X' or 'more details on X'\n"
-            "  - 'How does X compare to Y?' or 'which is better?'\n"
-            "  - 'What's the price of X?'\n"
-            "  - Follow-up questions like 'what about the other one?'\n"
-            "- Use manage_order ONLY ONCE when users first express intent to buy/purchase/order\n"
-            "- Use manage_order when users ask to 'view cart', 'check cart', 'see my items', or 'checkout'\n"
-            "- After calling manage_order, DO NOT call it again - the order agent will handle the conversation\n"
-            "- For greetings (hi, hello, hey), respond warmly and ask how you can help with products or orders\n"
-            "\n\n"
-            "HANDLING AMBIGUOUS OR UNCLEAR QUERIES:\n"
-            "- If the query is ambiguous, unclear, or you cannot determine which agent should handle it, "
-            "  DO NOT call any tool. Instead, respond directly with clarifying questions.\n"
-            "- Examples of ambiguous queries: single numbers (e.g., '2'), vague terms, incomplete sentences, "
-            "  or queries that could refer to either product search or ordering\n"
-            "- Ask specific questions to understand the user's intent, such as: "
-            "  'I'd like to help you, but could you clarify what you're looking for? Are you trying to: "
-            "  (1) search for products, or (2) place an order? If ordering, do you have a specific product ID?'\n"
-            "\n\n"
-            "OUT-OF-SCOPE QUERIES:\n"
-            "- For questions unrelated to products or orders (weather, news, general knowledge, etc.), "
-            "  DO NOT call any tool. Politely decline directly: "
-            "'I'm specialized in helping you find and purchase products. I can search our catalog or help you place an order. "
-            "For other questions, please contact our customer support team. What products can I help you with today?'\n"
-            "\n\n"
-            "GENERAL GUIDELINES:\n"
-            "- ALWAYS use search_products for any product information - answering from chat history alone is HALLUCINATION\n"
-            "- Be friendly, concise, and helpful\n"
-            "\n\n"
-            "RESPONSE FORMAT:\n"
-            "- You MUST return a valid JSON object matching the OrchestratorResponse schema.\n"
-            "- The JSON must have 'message' and 'agent_used' fields.\n"
-            "- DO NOT output any text, markdown, or explanations outside the JSON block.\n"
-            "- DO NOT include the ```json ... ``` markdown code fence, just the raw JSON object."
+            return self._order_tool_result(result)
+
+        async def amanage_order(request: str) -> str:
+            logger.info("Routing to Order Agent: %s", request)
+
+            self._state = OrchestratorState.CHECKOUT
+
+            result = await self.order_agent.ainvoke(
+                request, chat_history=self._order_history()
+            )
+
+            return self._order_tool_result(result)
+
+        # Each tool has a native coroutine, so ainvoke awaits the sub-agent
+        # instead of blocking a worker thread, and parallel tool calls from
+        # one model turn run concurrently
+        tools = [
+            StructuredTool.from_function(
+                func=search_products, coroutine=asearch_products
+            ),
+            StructuredTool.from_function(func=manage_order, coroutine=amanage_order),
+        ]
+
+        model = get_chat_model(
+            model_name,
+            temperature,
+            timeout,
+            prompt_cache_key="ecommerce-bot-orchestrator",
         )
 
         self.agent = create_agent(
             model,
-            tools=[search_products, manage_order],
-            system_prompt=system_prompt,
+            tools=tools,
+            system_prompt=SYSTEM_PROMPT,
             response_format=OrchestratorResponse,
             middleware=[
                 ModelCallLimitMiddleware(
@@ -236,7 +280,20 @@ class Orchestrator:
         )
 
         logger.info(
-            f"Orchestrator initialized with model={model_name}, temperature={temperature}, timeout={timeout}s"
+            "Orchestrator initialized with model=%s, temperature=%s, timeout=%ss",
+            model_name,
+            temperature,
+            timeout,
+        )
+
+    @cached_property
+    def order_agent(self) -> OrderAgent:
+        """Order agent, built the first time a request is routed to it."""
+        return OrderAgent(
+            model_name=self.model_name,
+            temperature=self.temperature,
+            timeout=self.timeout,
+            cart=self._cart,
         )
 
     def invoke(
@@ -253,16 +310,128 @@ class Orchestrator:
             OrchestratorResponse with agent's reply
         """
         logger.info(
-            f"Orchestrator processing: '{user_query}' (state={self._state.value})"
+            "Orchestrator processing: '%s' (state=%s)", user_query, self._state.value
         )
 
-        self._chat_history = chat_history.copy() if chat_history else []
+        # Only read, never mutated, so the caller's list is used without a copy
+        self._chat_history = chat_history or []
 
         if self._state.is_checkout_mode():
             return self._handle_checkout_mode(user_query)
 
         return self._handle_intent_mode(user_query)
 
+    async def ainvoke(
+        self, user_query: str, chat_history: Optional[List[Dict]] = None
+    ) -> OrchestratorResponse:
+        """
+        Process user query and route to appropriate agent without blocking the event loop.
+
+        Args:
+            user_query: User's question or request
+            chat_history: Optional conversation history
+
+        Returns:
+            OrchestratorResponse with agent's reply
+        """
+        logger.info(
+            "Orchestrator processing: '%s' (state=%s)", user_query, self._state.value
+        )
+
+        self._chat_history = chat_history or []
+
+        if self._state.is_checkout_mode():
+            return await self._ahandle_checkout_mode(user_query)
+
+        return await self._ahandle_intent_mode(user_query)
+
+    def stream(
+        self, user_query: str, chat_history: Optional[List[Dict]] = None
+    ) -> Iterator[Union[str, OrchestratorResponse]]:
+        """
+        Process user query, streaming the reply text as it is generated.
+
+        Replies routed through the orchestrator agent are streamed token by
+        token; checkout-mode replies come from the order agent in one piece.
+
+        Args:
+            user_query: User's question or request
+            chat_history: Optional conversation history
+
+        Yields:
+            Text deltas of the reply, then the final OrchestratorResponse
+            (whose message is authoritative if the stream was cut short)
+        """
+        logger.info(
+            "Orchestrator streaming: '%s' (state=%s)", user_query, self._state.value
+        )
+
+        self._chat_history = chat_history or []
+
+        if self._state.is_checkout_mode():
+            response = self._handle_checkout_mode(user_query)
+            yield response.message
+            yield response
+            return
+
+        messages = [*self._truncate_history(), {"role": "user", "content": user_query}]
+
+        result = {}
+        try:
+            for item in stream_structured(self.agent, {"messages": messages}):
+                if isinstance(item, str):
+                    yield item
+                else:
+                    result = item
+        except Exception as e:
+            logger.error("Error streaming orchestrator: %s", e, exc_info=True)
+            yield _ERROR_RESPONSE
+            return
+
+        yield self._handle_result(result)
+
+    async def astream(
+        self, user_query: str, chat_history: Optional[List[Dict]] = None
+    ) -> AsyncIterator[Union[str, OrchestratorResponse]]:
+        """
+        Async version of stream.
+
+        Args:
+            user_query: User's question or request
+            chat_history: Optional conversation history
+
+        Yields:
+            Text deltas of the reply, then the final OrchestratorResponse
+            (whose message is authoritative if the stream was cut short)
+        """
+        logger.info(
+            "Orchestrator streaming: '%s' (state=%s)", user_query, self._state.value
+        )
+
+        self._chat_history = chat_history or []
+
+        if self._state.is_checkout_mode():
+            response = await self._ahandle_checkout_mode(user_query)
+            yield response.message
+            yield response
+            return
+
+        messages = [*self._truncate_history(), {"role": "user", "content": user_query}]
+
+        result = {}
+        try:
+            async for item in astream_structured(self.agent, {"messages": messages}):
+                if isinstance(item, str):
+                    yield item
+                else:
+                    result = item
+        except Exception as e:
+            logger.error("Error streaming orchestrator: %s", e, exc_info=True)
+            yield _ERROR_RESPONSE
+            return
+
+        yield self._handle_result(result)
+
     def _handle_checkout_mode(self, user_query: str) -> OrchestratorResponse:
         """
         Handle queries when in checkout mode (locked to order agent).
@@ -274,38 +443,82 @@ class Orchestrator:
             OrchestratorResponse with order agent's reply or RAG agent reply if transferred
         """
         logger.info("In order mode, routing directly to order agent")
-        result = self.order_agent.invoke(
-            user_query, chat_history=self._truncate_history()
+        result = self.order_agent.invoke(user_query, chat_history=self._order_history())
+
+        if not self._exit_checkout_for_transfer(result):
+            return OrchestratorResponse(message=result.message, agent_used="order")
+
+        # Explicitly don't pass history on handover - assume new search intent and avoid timeouts
+        rag_result = self.rag_agent.invoke(user_query, chat_history=[])
+        return self._handover_response(result, rag_result)
+
+    async def _ahandle_checkout_mode(self, user_query: str) -> OrchestratorResponse:
+        """Async version of _handle_checkout_mode."""
+        logger.info("In order mode, routing directly to order agent")
+        result = await self.order_agent.ainvoke(
+            user_query, chat_history=self._order_history()
+        )
+
+        if not self._exit_checkout_for_transfer(result):
+            return OrchestratorResponse(message=result.message, agent_used="order")
+
+        rag_result = await self.rag_agent.ainvoke(user_query, chat_history=[])
+        return self._handover_response(result, rag_result)
+
+    def _exit_checkout_for_transfer(self, result: OrderResponse) -> bool:
+        """
+        Leave checkout mode if the order agent is done.
+
+        Args:
+            result: Order agent's response
+
+        Returns:
+            True if the order agent asked to hand the query over to the RAG agent
+        """
+        if not OrchestratorState.should_exit_checkout_mode(
+            result.status, result.transfer_to_agent
+        ):
+            return False
+
+        self._state = OrchestratorState.INTENT
+        logger.info("Order %s, exiting order mode", result.status)
+
+        if result.transfer_to_agent != "rag":
+            return False
+
+        logger.info("Order agent requested transfer to RAG, routing query")
+        return True
+
+    def _handover_response(
+        self, result: OrderResponse, rag_result: RAGResponse
+    ) -> OrchestratorResponse:
+        """Build the reply for a query handed over from the order agent to the RAG agent."""
+        # If RAG bounces back, return order transition message and await new query.
+        if rag_result.transfer_to_agent == "order":
+            logger.info(
+                "RAG agent bounced back (not a search query). Returning order agent transition message."
+            )
+            return OrchestratorResponse(message=result.message, agent_used="order")
+
+        # Append product details to message to preserve IDs in history
+        final_message = self._append_product_details(
+            rag_result.message, rag_result.products
         )
 
+        return OrchestratorResponse(message=final_message, agent_used="rag")
+
+    def _order_tool_result(self, result: OrderResponse) -> str:
+        """Build the manage_order tool output, leaving checkout mode if the order agent is done."""
         if OrchestratorState.should_exit_checkout_mode(
             result.status, result.transfer_to_agent
         ):
             self._state = OrchestratorState.INTENT
-            logger.info(f"Order {result.status}, exiting order mode")
+            logger.info("Order %s, exiting order mode", result.status)
 
             if result.transfer_to_agent == "rag":
-                logger.info("Order agent requested transfer to RAG, routing query")
-                # Explicitly don't pass history on handover - assume new search intent and avoid timeouts
-                rag_result = self.rag_agent.invoke(user_query, chat_history=[])
-
-                # If RAG bounces back, return order transition message and await new query.
-                if rag_result.transfer_to_agent == "order":
-                    logger.info(
-                        "RAG agent bounced back (not a search query). Returning order agent transition message."
-                    )
-                    return OrchestratorResponse(
-                        message=result.message, agent_used="order"
-                    )
-
-                # Append product details to message to preserve IDs in history
-                final_message = self._append_product_details(
-                    rag_result.message, rag_result.products
-                )
+                return "Let me transfer you back to product search. " + result.message
 
-                return OrchestratorResponse(message=final_message, agent_used="rag")
-
-        return OrchestratorResponse(message=result.message, agent_used="order")
+        return result.message
 
     def _handle_intent_mode(self, user_query: str) -> OrchestratorResponse:
         """
@@ -317,36 +530,40 @@ class Orchestrator:
         Returns:
             OrchestratorResponse with routed agent's reply
         """
-        messages = self._truncate_history().copy()
-        messages.append({"role": "user", "content": user_query})
+        messages = [*self._truncate_history(), {"role": "user", "content": user_query}]
 
         try:
             result = self.agent.invoke({"messages": messages})
         except Exception as e:
-            logger.error(f"Error invoking orchestrator: {e}", exc_info=True)
-            return OrchestratorResponse(
-                message="I encountered an error processing your request. Please try again.",
-                agent_used="orchestrator",
-            )
+            logger.error("Error invoking orchestrator: %s", e, exc_info=True)
+            return _ERROR_RESPONSE
+
+        return self._handle_result(result)
+
+    async def _ahandle_intent_mode(self, user_query: str) -> OrchestratorResponse:
+        """Async version of _handle_intent_mode."""
+        messages = [*self._truncate_history(), {"role": "user", "content": user_query}]
+
+        try:
+            result = await self.agent.ainvoke({"messages": messages})
+        except Exception as e:
+            logger.error("Error invoking orchestrator: %s", e, exc_info=True)
+            return _ERROR_RESPONSE
+
+        return self._handle_result(result)
 
+    @staticmethod
+    def _handle_result(result: Dict) -> OrchestratorResponse:
+        """Build the response from an orchestrator agent result."""
         structured_response = result.get("structured_response")
 
         if not structured_response:
             logger.debug(
                 "Orchestrator did not return a structured response - LLM may have had trouble determining intent"
             )
-            return OrchestratorResponse(
-                message=(
-                    "I'd like to help you, but could you clarify what you're looking for?\n\n"
-                    "Are you trying to:\n"
-                    "• Search for products in our catalog (e.g., 'show me laptops' or 'find wireless headphones')\n"
-                    "• Place an order (e.g., 'I want to buy TECH-007' or 'order 2 laptops')\n\n"
-                    "Please provide more details about what you'd like to do!"
-                ),
-                agent_used="orchestrator",
-            )
+            return _FALLBACK_RESPONSE
 
-        logger.info(f"Agent used: {structured_response.agent_used}")
+        logger.info("Agent used: %s", structured_response.agent_used)
         return structured_response
 
     def _append_product_details(self, message: str, products: List) -> str:
@@ -367,6 +584,31 @@ class Orchestrator:
 
         return message
 
+    def _order_history(self) -> List[Dict]:
+        """
+        Recent chat history for the order agent, keeping earlier order details.
+
+        Customers often give their email or the product IDs they want early
+        on. The most recent few user messages with such details that fall
+        outside the recent window are kept ahead of it, so the order agent
+        doesn't ask for them again.
+
+        Returns:
+            Chat history messages in chronological order
+        """
+        recent = self._truncate_history()
+        older = self._chat_history[: len(self._chat_history) - len(recent)]
+        pinned = [
+            message
+            for message in older
+            if message.get("role") == "user"
+            and _ORDER_DETAILS_PATTERN.search(message.get("content", ""))
+        ]
+        if not pinned:
+            return recent
+
+        return [*pinned[-_MAX_PINNED_ORDER_MESSAGES:], *recent]
+
     def _truncate_history(self) -> List[Dict]:
         """
         Truncate chat history to prevent timeouts from large context.
@@ -381,6 +623,8 @@ class Orchestrator:
 
         truncated = self._chat_history[-self.max_history_messages :]
         logger.debug(
-            f"Truncated history from {len(self._chat_history)} to {len(truncated)} messages"
+            "Truncated history from %s to %s messages",
+            len(self._chat_history),
+            len(truncated),
         )
         return truncated
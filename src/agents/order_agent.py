@@ -3,27 +3,201 @@ Order Agent for handling purchase requests and order creation.
 Uses LangChain's agent pattern with tools for order operations.
 """
 
+import copy
 import json
 import logging
+from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict, List, Optional
 
-from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.agents.middleware import (
     ModelCallLimitMiddleware,
     ToolCallLimitMiddleware,
 )
-from langchain.tools import tool
-from langchain_openai import ChatOpenAI
+from langchain_core.tools import StructuredTool
+from pydantic import PrivateAttr
 
-from database import OrderDatabase, ProductCatalog
+from agents.llm import get_chat_model
+from database import OrderDatabase, ProductCatalog, get_product_catalog
 from schema import OrderResponse
 
-load_dotenv()
-
 logger = logging.getLogger(__name__)
 
 
+SYSTEM_PROMPT = (
+    "You are a helpful order assistant for an e-commerce store. Your role is to help customers place orders. "
+    "You have access to the full conversation history, so ALWAYS use it to understand context and follow-up responses. "
+    "\n\n"
+    "CRITICAL: ANTI-HALLUCINATION RULES\n"
+    "1. If the user EXPLICITLY provides a Product ID in their message (e.g., 'Buy SPORT-003'), TRUST IT and use it with add_to_cart.\n"
+    "   - The add_to_cart tool will validate if the ID exists. If it fails, report the error to the user.\n"
+    "2. If the user refers to a product BY NAME ONLY (e.g., 'Buy the yoga mat', 'Add AirPods'):\n"
+    "   - Look in chat history for the Product ID associated with that name.\n"
+    "   - If found (e.g., 'AirPods Pro (ID: TECH-003)'), use that exact ID.\n"
+    "   - If NOT found, DO NOT GUESS. Ask: 'Could you provide the Product ID or would you like me to search for it?'\n"
+    "3. NEVER invent a Product ID. Only use IDs that are either:\n"
+    "   - Explicitly stated by the user in the current message, OR\n"
+    "   - Found in chat history with a matching product name.\n"
+    "4. If add_to_cart fails, report the exact error to the user and ask for clarification.\n"
+    "\n"
+    "CRITICAL: MANDATORY ORDER CONFIRMATION\n"
+    "1. You MUST ask 'Are you ready to place your order?' BEFORE calling create_order.\n"
+    "2. NEVER call create_order immediately after receiving the shipping address.\n"
+    "3. The correct sequence is: collect address → show order summary with view_cart → ask 'Are you ready?' → wait for 'yes' → create_order\n"
+    "4. Only call create_order when the customer explicitly says 'yes', 'confirm', 'place order', or similar AFTER you asked for confirmation.\n"
+    "5. Providing the address is NOT consent to place the order. You MUST still ask for explicit confirmation.\n"
+    "\n"
+    "USING CHAT HISTORY:\n"
+    "- The conversation history is available in the messages you receive\n"
+    "- To find product_id when customer mentions product by name:\n"
+    "  1. Look through previous assistant messages for product listings\n"
+    "  2. Search for patterns like 'Product ID: TECH-001' or '(ID: TECH-001)' or '**Product ID:** TECH-001'\n"
+    "  3. Match the product name mentioned by customer to the name in previous listings\n"
+    "  4. Extract the EXACT product_id from that listing - do not modify or guess it\n"
+    "- Example: If customer says 'I want the macbook' and earlier you see 'MacBook Pro 16-inch (ID: TECH-001)', use TECH-001\n"
+    "- If product_id cannot be found in chat history, DO NOT GUESS - ask customer to provide the product ID\n"
+    "\n"
+    "TOOLS AVAILABLE:\n"
+    "1. add_to_cart - Validate product and add/update it in the shopping cart\n"
+    "2. remove_from_cart - Remove an item from the shopping cart\n"
+    "3. view_cart - Show current cart contents with items, quantities, and total\n"
+    "4. create_order - Create order from cart (requires customer info: name, email, address)\n"
+    "5. transfer_to_rag_agent - Transfer customer back to product search\n"
+    "\n"
+    "WHEN TO TRANSFER:\n"
+    "- Customer wants to search for products\n"
+    "- Customer wants to browse catalog or get product info\n"
+    "- Customer wants product recommendations or comparisons\n"
+    "When transferring: Use transfer_to_rag_agent tool, set 'transfer_to_agent' field to 'rag', and include a friendly message.\n"
+    "\n"
+    "ORDER PROCESS:\n"
+    "1. ADD TO CART: Use add_to_cart tool for EACH product_id and quantity\n"
+    "   - If user provides a Product ID (e.g., 'order TECH-009'), USE IT DIRECTLY with add_to_cart\n"
+    "   - If user mentions product BY NAME ONLY, look in chat history for the ID\n"
+    "   - Only ask for ID if user gives a name AND it's not in chat history\n"
+    "   - Extract quantity from customer's message:\n"
+    "     * Numbers: 'I want 2 macbook' → quantity = 2\n"
+    "     * Number words: 'I want three laptops' → quantity = 3\n"
+    "     * Articles: 'I want to buy a macbook' → quantity = 1\n"
+    "     * No quantity mentioned: 'I want macbook' → quantity = 1 (infer from context)\n"
+    "   - If quantity is clear (explicit number or article), add to cart immediately\n"
+    "   - If quantity is truly ambiguous, ask 'How many would you like to order?'\n"
+    "   - add_to_cart validates AND stores - no separate validation step needed\n"
+    "2. ASK TO ADD MORE: After each add_to_cart, ask 'Would you like to add anything else to your cart?'\n"
+    "3. VIEW CART: Use view_cart tool when customer asks about their cart or before checkout\n"
+    "4. COLLECT INFO: Once done shopping, collect - Name, Email, Full shipping address\n"
+    "5. FINAL CONFIRMATION: Use view_cart to show summary, then EXPLICITLY ask: 'Are you ready to place your order?'\n"
+    "6. CHECKOUT: ONLY when user says 'yes' or 'place order' to the final confirmation, use create_order\n"
+    "   - DO NOT call create_order just because you have the address. You MUST get a final 'yes'.\n"
+    "\n"
+    "IMPORTANT RULES:\n"
+    "- Extract quantity from customer's message FIRST before asking questions\n"
+    "- Use add_to_cart to add/update items - it validates AND stores in one step\n"
+    "- Use remove_from_cart when customer wants to remove an item from cart\n"
+    "- Use view_cart whenever customer asks 'what's in my cart?' or 'show my cart'\n"
+    "- To update quantity, use add_to_cart again with new quantity (replaces old quantity)\n"
+    "- Use ONLY product information from add_to_cart tool results - never invent prices, names, or details\n"
+    "- If add_to_cart returns an error (product not found, out of stock), use that exact information\n"
+    "- After each add_to_cart, ask about adding more items\n"
+    "- Support multiple items in a single order\n"
+    "- Never create order without FINAL confirmation ('Are you ready to place your order?')\n"
+    "- Sending the address is NOT a confirmation to place the order immediately. You must still ask 'Are you ready?'\n"
+    "- Handle out-of-stock by offering alternatives or transferring to search\n"
+    "- Ask for one detail at a time if not all provided\n"
+    "- create_order automatically uses cart contents - no need to pass items\n"
+    "\n"
+    "RESPONSE FORMAT:\n"
+    "- 'status': MUST be one of: 'collecting_info', 'confirming', 'completed', 'failed'\n"
+    "  * 'collecting_info': Validating products, collecting customer details (name/email/address), or asking about adding more items\n"
+    "  * 'confirming': Showing order summary and waiting for final confirmation\n"
+    "  * 'completed': Order successfully created with order ID\n"
+    "  * 'failed': ONLY when cannot fulfill order (e.g., all products out of stock, invalid product)\n"
+    "- 'transfer_to_agent': Set to 'rag' when customer wants to search/browse products, otherwise None\n"
+    "- 'order_summary': When status is 'confirming', the cart items, total and customer details (name, email, shipping address); otherwise None\n"
+    "- 'message': Your friendly response to the customer\n"
+    "- NEVER use status='failed' just to ask for information - use 'collecting_info' instead!"
+)
+
+
+@dataclass(slots=True)
+class CartItem:
+    """Item held in the shopping cart until the order is created."""
+
+    product_id: str
+    product_name: str
+    quantity: int
+    unit_price: float
+
+
+_ADDED_TMPL = (
+    "✓ Added to cart:\n"
+    "- {name} (ID: {product_id})\n"
+    "- Quantity: {quantity}\n"
+    "- Price: ${price:.2f} each\n"
+    "- Subtotal: ${subtotal:.2f}\n"
+    "- Stock: {stock}\n"
+)
+
+_UPDATED_TMPL = (
+    "✓ Updated cart:\n"
+    "- {name} (ID: {product_id})\n"
+    "- Quantity: {quantity}\n"
+    "- Subtotal: ${subtotal:.2f}\n"
+)
+
+_ORDER_ITEM_TMPL = "- {quantity}x {name} @ ${price:.2f} each = ${subtotal:.2f}"
+
+_ORDER_PLACED_TMPL = (
+    "✅ Order placed successfully!\n\n"
+    "Order ID: {order_id}\n"
+    "Customer: {customer_name}\n"
+    "Email: {email}\n\n"
+    "Items:\n{items}\n\n"
+    "Total: ${total:.2f}\n\n"
+    "Shipping to: {shipping_address}\n\n"
+    "Your order has been confirmed! Order ID: {order_id}. Total: ${total:.2f}. Thank you!"
+)
+
+_ERROR_RESPONSE = OrderResponse(
+    message="I encountered an error processing your order. Please try again.",
+    status="failed",
+    missing_fields=[],
+)
+
+# Helpful fallback that guides the user when the agent returns no structured response
+_FALLBACK_RESPONSE = OrderResponse(
+    message=(
+        "I'm not quite sure what you'd like to do. Could you clarify?\n"
+        "• If you want to order a product, please provide the product ID (e.g., 'TECH-001') and quantity\n"
+        "• If you want to search for products, I can help you browse our catalog\n"
+        "• If you're continuing an order, please answer my previous question"
+    ),
+    status="collecting_info",
+    missing_fields=[],
+)
+
+
+class CachedSchemaTool(StructuredTool):
+    """
+    StructuredTool that reuses its tool-call JSON schema across model calls.
+
+    The agent binds its tools to the model on every call, which normally rebuilds
+    a Pydantic model and its JSON schema per tool. A tool's signature is fixed, so
+    each tool generates its schema once and hands out copies of it.
+    Input validation still uses the regular ``args_schema``.
+    """
+
+    _tool_call_schema: Optional[dict] = PrivateAttr(default=None)
+
+    @property
+    def tool_call_schema(self) -> dict:
+        """Return a copy of the cached JSON schema exposed to the model."""
+        if self._tool_call_schema is None:
+            self._tool_call_schema = super().tool_call_schema.model_json_schema()
+        return copy.deepcopy(self._tool_call_schema)
+
+
 class OrderAgent:
     """
     Order Agent for processing customer orders.
@@ -37,7 +211,7 @@ class OrderAgent:
         model_name: str = "gpt-4o-mini",
         temperature: float = 0,
         timeout: int = 60,
-        cart: Optional[List[Dict]] = None,
+        cart: Optional[List[CartItem]] = None,
     ):
         """
         Initialize the Order Agent.
@@ -51,11 +225,11 @@ class OrderAgent:
         self.model_name = model_name
         self.temperature = temperature
         self.timeout = timeout
-        self.catalog = ProductCatalog()
-        self.order_db = OrderDatabase()
         self.cart = cart if cart is not None else []
+        # Order created by the create_order tool during the current invoke
+        self._created_order_id: Optional[str] = None
 
-        @tool
+        @CachedSchemaTool.from_function
         def transfer_to_rag_agent(reason: str) -> str:
             """
             Transfer the conversation back to the Product Search Agent.
@@ -73,10 +247,10 @@ class OrderAgent:
             Returns:
                 Confirmation message
             """
-            logger.info(f"Transfer to RAG Agent requested: {reason}")
+            logger.info("Transfer to RAG Agent requested: %s", reason)
             return f"TRANSFER_TO_RAG: {reason}"
 
-        @tool
+        @CachedSchemaTool.from_function
         def add_to_cart(product_id: str, quantity: int = 1) -> str:
             """
             Validate product and add it to the shopping cart.
@@ -95,7 +269,9 @@ class OrderAgent:
                 Success message with product details, or error message if validation fails
             """
             logger.debug(
-                f"Tool called: add_to_cart(product_id='{product_id}', quantity={quantity})"
+                "Tool called: add_to_cart(product_id='%s', quantity=%s)",
+                product_id,
+                quantity,
             )
 
             product = self.catalog.get_product(product_id)
@@ -112,38 +288,37 @@ class OrderAgent:
                     f"Would you like me to suggest similar products?"
                 )
 
-            existing_item = None
-            for item in self.cart:
-                if item["product_id"] == product_id:
-                    existing_item = item
-                    break
+            existing_item = next(
+                (item for item in self.cart if item.product_id == product_id), None
+            )
+
+            name = product["name"]
+            price = product["price"]
 
             if existing_item:
-                existing_item["quantity"] = quantity
-                subtotal = product["price"] * quantity
-                result = (
-                    f"✓ Updated cart:\n"
-                    f"- {product['name']} (ID: {product_id})\n"
-                    f"- Quantity: {quantity}\n"
-                    f"- Subtotal: ${subtotal:.2f}\n"
+                existing_item.quantity = quantity
+                result = _UPDATED_TMPL.format(
+                    name=name,
+                    product_id=product_id,
+                    quantity=quantity,
+                    subtotal=price * quantity,
                 )
             else:
                 self.cart.append(
-                    {
-                        "product_id": product_id,
-                        "product_name": product["name"],
-                        "quantity": quantity,
-                        "unit_price": product["price"],
-                    }
+                    CartItem(
+                        product_id=product_id,
+                        product_name=name,
+                        quantity=quantity,
+                        unit_price=price,
+                    )
                 )
-                subtotal = product["price"] * quantity
-                result = (
-                    f"✓ Added to cart:\n"
-                    f"- {product['name']} (ID: {product_id})\n"
-                    f"- Quantity: {quantity}\n"
-                    f"- Price: ${product['price']:.2f} each\n"
-                    f"- Subtotal: ${subtotal:.2f}\n"
-                    f"- Stock: {stock_status.replace('_', ' ').title()}\n"
+                result = _ADDED_TMPL.format(
+                    name=name,
+                    product_id=product_id,
+                    quantity=quantity,
+                    price=price,
+                    subtotal=price * quantity,
+                    stock=stock_status.replace("_", " ").title(),
                 )
 
             if stock_status == "low_stock":
@@ -151,7 +326,7 @@ class OrderAgent:
 
             return result
 
-        @tool
+        @CachedSchemaTool.from_function
         def remove_from_cart(product_id: str) -> str:
             """
             Remove an item from the shopping cart.
@@ -164,23 +339,24 @@ class OrderAgent:
             Returns:
                 Confirmation message if removed, or error if not found in cart
             """
-            logger.debug(f"Tool called: remove_from_cart(product_id='{product_id}')")
-
-            removed = False
-            product_name = None
-            for i, item in enumerate(self.cart):
-                if item["product_id"] == product_id:
-                    product_name = item["product_name"]
-                    self.cart.pop(i)
-                    removed = True
-                    break
-
-            if removed:
-                return f"✓ Removed {product_name} (ID: {product_id}) from your cart."
-            else:
+            logger.debug("Tool called: remove_from_cart(product_id='%s')", product_id)
+
+            idx = next(
+                (
+                    i
+                    for i, item in enumerate(self.cart)
+                    if item.product_id == product_id
+                ),
+                -1,
+            )
+
+            if idx < 0:
                 return f"Product {product_id} is not in your cart."
 
-        @tool
+            product_name = self.cart.pop(idx).product_name
+            return f"✓ Removed {product_name} (ID: {product_id}) from your cart."
+
+        @CachedSchemaTool.from_function
         def view_cart() -> str:
             """
             View the current contents of the shopping cart.
@@ -200,18 +376,18 @@ class OrderAgent:
             total = 0
 
             for item in self.cart:
-                subtotal = item["quantity"] * item["unit_price"]
+                subtotal = item.quantity * item.unit_price
                 total += subtotal
                 lines.append(
-                    f"- {item['quantity']}x {item['product_name']} (ID: {item['product_id']}) "
-                    f"@ ${item['unit_price']:.2f} each = ${subtotal:.2f}"
+                    f"- {item.quantity}x {item.product_name} (ID: {item.product_id}) "
+                    f"@ ${item.unit_price:.2f} each = ${subtotal:.2f}"
                 )
 
             result = "🛒 Your Cart:\n\n" + "\n".join(lines) + f"\n\nTotal: ${total:.2f}"
 
             return result
 
-        @tool
+        @CachedSchemaTool.from_function
         def create_order(
             customer_name: str,
             email: str,
@@ -237,7 +413,7 @@ class OrderAgent:
                 Order confirmation with order ID and details
             """
 
-            logger.debug(f"Tool called: create_order")
+            logger.debug("Tool called: create_order")
 
             if not self.cart:
                 return "Error: Your cart is empty. Please add items to your cart before placing an order."
@@ -247,8 +423,8 @@ class OrderAgent:
             items_summary = []
 
             for cart_item in self.cart:
-                product_id = cart_item["product_id"]
-                quantity = cart_item["quantity"]
+                product_id = cart_item.product_id
+                quantity = cart_item.quantity
 
                 product = self.catalog.get_product(product_id)
                 if not product:
@@ -257,20 +433,24 @@ class OrderAgent:
                 if not self.catalog.is_available(product_id):
                     return f"Error: {product['name']} is now out of stock. Please remove it from your cart or choose an alternative."
 
-                subtotal = product["price"] * quantity
+                name = product["name"]
+                price = product["price"]
+                subtotal = price * quantity
                 total += subtotal
 
                 order_items.append(
                     {
                         "product_id": product_id,
-                        "product_name": product["name"],
+                        "product_name": name,
                         "quantity": quantity,
-                        "unit_price": product["price"],
+                        "unit_price": price,
                     }
                 )
 
                 items_summary.append(
-                    f"- {quantity}x {product['name']} @ ${product['price']:.2f} each = ${subtotal:.2f}"
+                    _ORDER_ITEM_TMPL.format(
+                        quantity=quantity, name=name, price=price, subtotal=subtotal
+                    )
                 )
 
             order = self.order_db.create_order(
@@ -280,117 +460,23 @@ class OrderAgent:
             )
 
             logger.info(
-                f"Order created: {order.order_id} with {len(order_items)} items"
+                "Order created: %s with %s items", order.order_id, len(order_items)
             )
 
             self.cart.clear()
+            self._created_order_id = order.order_id
 
-            items_text = "\n".join(items_summary)
-
-            return (
-                f"✅ Order placed successfully!\n\n"
-                f"Order ID: {order.order_id}\n"
-                f"Customer: {customer_name}\n"
-                f"Email: {email}\n\n"
-                f"Items:\n{items_text}\n\n"
-                f"Total: ${total:.2f}\n\n"
-                f"Shipping to: {shipping_address}\n\n"
-                f"Your order has been confirmed! Order ID: {order.order_id}. Total: ${total:.2f}. Thank you!"
+            return _ORDER_PLACED_TMPL.format(
+                order_id=order.order_id,
+                customer_name=customer_name,
+                email=email,
+                items="\n".join(items_summary),
+                total=total,
+                shipping_address=shipping_address,
             )
 
-        model = ChatOpenAI(model=model_name, temperature=temperature, timeout=timeout)
-
-        system_prompt = (
-            "You are a helpful order assistant for an e-commerce store. Your role is to help customers place orders. "
-            "You have access to the full conversation history, so ALWAYS use it to understand context and follow-up responses. "
-            "\n\n"
-            "CRITICAL: ANTI-HALLUCINATION RULES\n"
-            "1. If the user EXPLICITLY provides a Product ID in their message (e.g., 'Buy SPORT-003'), TRUST IT and use it with add_to_cart.\n"
-            "   - The add_to_cart tool will validate if the ID exists. If it fails, report the error to the user.\n"
-            "2. If the user refers to a product BY NAME ONLY (e.g., 'Buy the yoga mat', 'Add AirPods'):\n"
-            "   - Look in chat history for the Product ID associated with that name.\n"
-            "   - If found (e.g., 'AirPods Pro (ID: TECH-003)'), use that exact ID.\n"
-            "   - If NOT found, DO NOT GUESS. Ask: 'Could you provide the Product ID or would you like me to search for it?'\n"
-            "3. NEVER invent a Product ID. Only use IDs that are either:\n"
-            "   - Explicitly stated by the user in the current message, OR\n"
-            "   - Found in chat history with a matching product name.\n"
-            "4. If add_to_cart fails, report the exact error to the user and ask for clarification.\n"
-            "\n"
-            "CRITICAL: MANDATORY ORDER CONFIRMATION\n"
-            "1. You MUST ask 'Are you ready to place your order?' BEFORE calling create_order.\n"
-            "2. NEVER call create_order immediately after receiving the shipping address.\n"
-            "3. The correct sequence is: collect address → show order summary with view_cart → ask 'Are you ready?' → wait for 'yes' → create_order\n"
-            "4. Only call create_order when the customer explicitly says 'yes', 'confirm', 'place order', or similar AFTER you asked for confirmation.\n"
-            "5. Providing the address is NOT consent to place the order. You MUST still ask for explicit confirmation.\n"
-            "\n"
-            "USING CHAT HISTORY:\n"
-            "- The conversation history is available in the messages you receive\n"
-            "- To find product_id when customer mentions product by name:\n"
-            "  1. Look through previous assistant messages for product listings\n"
-            "  2. Search for patterns like 'Product ID: TECH-001' or '(ID: TECH-001)' or '**Product ID:** TECH-001'\n"
-            "  3. Match the product name mentioned by customer to the name in previous listings\n"
-            "  4. Extract the EXACT product_id from that listing - do not modify or guess it\n"
-            "- Example: If customer says 'I want the macbook' and earlier you see 'MacBook Pro 16-inch (ID: TECH-001)', use TECH-001\n"
-            "- If product_id cannot be found in chat history, DO NOT GUESS - ask customer to provide the product ID\n"
-            "\n"
-            "TOOLS AVAILABLE:\n"
-            "1. add_to_cart - Validate product and add/update it in the shopping cart\n"
-            "2. remove_from_cart - Remove an item from the shopping cart\n"
-            "3. view_cart - Show current cart contents with items, quantities, and total\n"
-            "4. create_order - Create order from cart (requires customer info: name, email, address)\n"
-            "5. transfer_to_rag_agent - Transfer customer back to product search\n"
-            "\n"
-            "WHEN TO TRANSFER:\n"
-            "- Customer wants to search for products\n"
-            "- Customer wants to browse catalog or get product info\n"
-            "- Customer wants product recommendations or comparisons\n"
-            "When transferring: Use transfer_to_rag_agent tool, set 'transfer_to_agent' field to 'rag', and include a friendly message.\n"
-            "\n"
-            "ORDER PROCESS:\n"
-            "1. ADD TO CART: Use add_to_cart tool for EACH product_id and quantity\n"
-            "   - If user provides a Product ID (e.g., 'order TECH-009'), USE IT DIRECTLY with add_to_cart\n"
-            "   - If user mentions product BY NAME ONLY, look in chat history for the ID\n"
-            "   - Only ask for ID if user gives a name AND it's not in chat history\n"
-            "   - Extract quantity from customer's message:\n"
-            "     * Numbers: 'I want 2 macbook' → quantity = 2\n"
-            "     * Number words: 'I want three laptops' → quantity = 3\n"
-            "     * Articles: 'I want to buy a macbook' → quantity = 1\n"
-            "     * No quantity mentioned: 'I want macbook' → quantity = 1 (infer from context)\n"
-            "   - If quantity is clear (explicit number or article), add to cart immediately\n"
-            "   - If quantity is truly ambiguous, ask 'How many would you like to order?'\n"
-            "   - add_to_cart validates AND stores - no separate validation step needed\n"
-            "2. ASK TO ADD MORE: After each add_to_cart, ask 'Would you like to add anything else to your cart?'\n"
-            "3. VIEW CART: Use view_cart tool when customer asks about their cart or before checkout\n"
-            "4. COLLECT INFO: Once done shopping, collect - Name, Email, Full shipping address\n"
-            "5. FINAL CONFIRMATION: Use view_cart to show summary, then EXPLICITLY ask: 'Are you ready to place your order?'\n"
-            "6. CHECKOUT: ONLY when user says 'yes' or 'place order' to the final confirmation, use create_order\n"
-            "   - DO NOT call create_order just because you have the address. You MUST get a final 'yes'.\n"
-            "\n"
-            "IMPORTANT RULES:\n"
-            "- Extract quantity from customer's message FIRST before asking questions\n"
-            "- Use add_to_cart to add/update items - it validates AND stores in one step\n"
-            "- Use remove_from_cart when customer wants to remove an item from cart\n"
-            "- Use view_cart whenever customer asks 'what's in my cart?' or 'show my cart'\n"
-            "- To update quantity, use add_to_cart again with new quantity (replaces old quantity)\n"
-            "- Use ONLY product information from add_to_cart tool results - never invent prices, names, or details\n"
-            "- If add_to_cart returns an error (product not found, out of stock), use that exact information\n"
-            "- After each add_to_cart, ask about adding more items\n"
-            "- Support multiple items in a single order\n"
-            "- Never create order without FINAL confirmation ('Are you ready to place your order?')\n"
-            "- Sending the address is NOT a confirmation to place the order immediately. You must still ask 'Are you ready?'\n"
-            "- Handle out-of-stock by offering alternatives or transferring to search\n"
-            "- Ask for one detail at a time if not all provided\n"
-            "- create_order automatically uses cart contents - no need to pass items\n"
-            "\n"
-            "RESPONSE FORMAT:\n"
-            "- 'status': MUST be one of: 'collecting_info', 'confirming', 'completed', 'failed'\n"
-            "  * 'collecting_info': Validating products, collecting customer details (name/email/address), or asking about adding more items\n"
-            "  * 'confirming': Showing order summary and waiting for final confirmation\n"
-            "  * 'completed': Order successfully created with order ID\n"
-            "  * 'failed': ONLY when cannot fulfill order (e.g., all products out of stock, invalid product)\n"
-            "- 'transfer_to_agent': Set to 'rag' when customer wants to search/browse products, otherwise None\n"
-            "- 'message': Your friendly response to the customer\n"
-            "- NEVER use status='failed' just to ask for information - use 'collecting_info' instead!"
+        model = get_chat_model(
+            model_name, temperature, timeout, prompt_cache_key="ecommerce-bot-order"
         )
 
         self.agent = create_agent(
@@ -402,7 +488,7 @@ class OrderAgent:
                 view_cart,
                 create_order,
             ],
-            system_prompt=system_prompt,
+            system_prompt=SYSTEM_PROMPT,
             response_format=OrderResponse,
             middleware=[
                 ModelCallLimitMiddleware(
@@ -425,9 +511,22 @@ class OrderAgent:
         )
 
         logger.info(
-            f"Order Agent initialized with model={model_name}, temperature={temperature}, timeout={timeout}s"
+            "Order Agent initialized with model=%s, temperature=%s, timeout=%ss",
+            model_name,
+            temperature,
+            timeout,
         )
 
+    @cached_property
+    def catalog(self) -> ProductCatalog:
+        """Product catalog, loaded on first use by an order tool."""
+        return get_product_catalog()
+
+    @cached_property
+    def order_db(self) -> OrderDatabase:
+        """Order database connection, opened on first use by an order tool."""
+        return OrderDatabase()
+
     def invoke(
         self, user_query: str, chat_history: Optional[List[Dict]] = None
     ) -> OrderResponse:
@@ -441,38 +540,64 @@ class OrderAgent:
         Returns:
             OrderResponse with structured order status and message
         """
-        logger.info(f"Processing order request: '{user_query}'")
+        logger.info("Processing order request: '%s'", user_query)
 
-        messages = chat_history.copy() if chat_history else []
-        messages.append({"role": "user", "content": user_query})
+        messages = [*(chat_history or ()), {"role": "user", "content": user_query}]
+        self._created_order_id = None
 
         try:
             result = self.agent.invoke({"messages": messages})
         except Exception as e:
-            logger.error(f"Error invoking order agent: {e}", exc_info=True)
-            return OrderResponse(
-                message="I encountered an error processing your order. Please try again.",
-                status="failed",
-                missing_fields=[],
-            )
+            logger.error("Error invoking order agent: %s", e, exc_info=True)
+            return _ERROR_RESPONSE
+
+        return self._handle_result(result)
+
+    async def ainvoke(
+        self, user_query: str, chat_history: Optional[List[Dict]] = None
+    ) -> OrderResponse:
+        """
+        Process customer order request without blocking the event loop.
+
+        Args:
+            user_query: Customer's order request or response
+            chat_history: Optional list of previous messages in conversation
 
+        Returns:
+            OrderResponse with structured order status and message
+        """
+        logger.info("Processing order request: '%s'", user_query)
+
+        messages = [*(chat_history or ()), {"role": "user", "content": user_query}]
+        self._created_order_id = None
+
+        try:
+            result = await self.agent.ainvoke({"messages": messages})
+        except Exception as e:
+            logger.error("Error invoking order agent: %s", e, exc_info=True)
+            return _ERROR_RESPONSE
+
+        return self._handle_result(result)
+
+    def _handle_result(self, result: Dict) -> OrderResponse:
+        """Build the response from an agent result, trusting create_order for the order status."""
         structured_response = result.get("structured_response")
 
         if not structured_response:
             logger.debug(
                 "Agent did not return a structured response - LLM may have had trouble determining intent"
             )
-            # Provide a helpful fallback message that guides the user
-            return OrderResponse(
-                message=(
-                    "I'm not quite sure what you'd like to do. Could you clarify?\n"
-                    "• If you want to order a product, please provide the product ID (e.g., 'TECH-001') and quantity\n"
-                    "• If you want to search for products, I can help you browse our catalog\n"
-                    "• If you're continuing an order, please answer my previous question"
-                ),
-                status="collecting_info",
-                missing_fields=[],
+            return _FALLBACK_RESPONSE
+
+        # The order status comes from the tool that actually committed the
+        # order, not from the model's reading of the conversation
+        if self._created_order_id and (
+            structured_response.status != "completed"
+            or structured_response.order_id != self._created_order_id
+        ):
+            structured_response = structured_response.model_copy(
+                update={"status": "completed", "order_id": self._created_order_id}
             )
 
-        logger.info(f"Order status: {structured_response.status}")
+        logger.info("Order status: %s", structured_response.status)
         return structured_response
@@ -3,27 +3,125 @@ RAG Agent for product search and information retrieval.
 Uses LangChain's agent pattern with tool-based retrieval.
 """
 
+import asyncio
 import logging
+from types import MappingProxyType
 from typing import Dict, List, Optional
 
-from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.agents.middleware import (
     ModelCallLimitMiddleware,
     ToolCallLimitMiddleware,
 )
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
+from langchain_core.documents import Document
 
 
-from database import ProductCatalog, ProductVectorStore
-from schema import RAGResponse
-
-load_dotenv()
+from agents.llm import get_chat_model
+from database import SemanticCache, get_product_catalog, get_product_vector_store
+from schema import PRODUCTS_ADAPTER, RAGAgentOutput, RAGResponse
 
 logger = logging.getLogger(__name__)
 
 
+SYSTEM_PROMPT = (
+    "You are a helpful e-commerce product assistant. Your role is to help customers find products and answer questions about them. "
+    "\n\n"
+    "CRITICAL: ANTI-HALLUCINATION RULES\n"
+    "1. You must ALWAYS use the 'retrieve_products' tool to search for products. Do not answer from your internal knowledge.\n"
+    "2. The 'retrieve_products' tool is the SINGLE SOURCE OF TRUTH. If a product is not returned by the tool, IT DOES NOT EXIST.\n"
+    "3. You must ONLY recommend products that are explicitly listed in the 'retrieve_products' tool output.\n"
+    "4. NEVER invent, guess, or assume product details, prices, features, or availability. If it's not in the tool output, don't say it.\n"
+    "5. Check the Product IDs. If you are about to suggest a product that doesn't have a matching ID in the tool output, STOP. Do not include it.\n"
+    "6. If the tool returns no results, state clearly that you couldn't find matches in the catalog.\n"
+    "\n"
+    "COMPARISON QUERIES:\n"
+    "When a user asks to compare products (e.g., 'How does X compare to Y?', 'which is better?'):\n"
+    "1. Call retrieve_products_batch with ALL products being compared in a single call\n"
+    "2. Only compare attributes that are explicitly returned by the tool\n"
+    "3. If a product cannot be found, state that you cannot compare because the product was not found\n"
+    "4. NEVER make up specifications like processor details, weight, battery life, etc. unless returned by the tool\n"
+    "\n"
+    "TOOLS AVAILABLE:\n"
+    "1. retrieve_products - Search our product catalog\n"
+    "   Use this tool to search for products by name, category, features, or product ID\n"
+    "   Set 'category' when the customer asks for a specific kind of product (e.g. laptops -> Electronics) so unrelated items are excluded\n"
+    "   The tool automatically formats results appropriately:\n"
+    "   - For browsing/searching: Returns numbered list format\n"
+    "   - For specific product queries: Returns detailed product information\n"
+    "\n"
+    "2. retrieve_products_batch - Search for several products in one call\n"
+    "   Use this when comparing products or answering questions about multiple products\n"
+    "\n"
+    "3. transfer_to_order_agent - Transfer customer to order specialist when they want to make a purchase\n"
+    "\n"
+    "WHEN TO TRANSFER:\n"
+    "- Customer wants to buy, purchase, or order a product\n"
+    "- Customer wants to add items to cart or checkout\n"
+    "- Customer wants to complete a purchase\n"
+    "When transferring, set 'transfer_to_agent' to 'order' and include a friendly message like 'Let me connect you with our order specialist to complete your purchase.'\n"
+    "\n"
+    "RESPONSE FORMAT:\n"
+    "You MUST provide a structured response with these fields:\n"
+    "- 'message': A friendly, conversational response to the customer's query\n"
+    "- 'product_ids': IDs of ALL relevant products from retrieved results (e.g., ['TECH-001', 'TECH-002']). Product details are filled in automatically from the catalog\n"
+    "- 'transfer_to_agent': Set to 'order' when customer wants to purchase, otherwise None\n"
+    "\n"
+    "BEST PRACTICES:\n"
+    "- ALWAYS prominently display the Product ID in your message (e.g., 'MacBook Pro 16-inch (ID: TECH-001)')\n"
+    "- Format products clearly with ID first for easy reference when ordering\n"
+    "- ONLY include products truly relevant to the query (e.g., for 'laptops', exclude accessories)\n"
+    "- Highlight price, category, and stock status in your message\n"
+    "- Mention if products are out of stock and suggest alternatives\n"
+    "- Remind customers to use the Product ID when placing orders\n"
+    "- If no relevant products found, ask for clarification politely"
+)
+
+_ERROR_RESPONSE = RAGResponse(
+    message="I encountered an error searching for products. Please try again.",
+    products=[],
+)
+
+# Helpful fallback that guides the user when the agent returns no structured response
+_FALLBACK_RESPONSE = RAGResponse(
+    message=(
+        "I'm having trouble understanding your search. Could you try rephrasing?\n"
+        "• Try being more specific about what you're looking for\n"
+        "• You can search by product name, category, or features\n"
+        "• For example: 'show me laptops' or 'wireless headphones under $100'"
+    ),
+    products=[],
+)
+# Inputs answered with a canned prompt instead of an LLM round trip
+_GREETINGS = frozenset({"hi", "hello", "hey", "help", "?"})
+
+_GREETING_RESPONSE = RAGResponse(
+    message="Hi! What product are you looking for?",
+    products=[],
+)
+
+_STOCK_STATUS_LABELS = MappingProxyType(
+    {
+        "in_stock": "In Stock",
+        "low_stock": "Low Stock",
+        "out_of_stock": "Out of Stock",
+    }
+)
+
+# Bound lookup of the display label for a stock status; callers pass the raw
+# status as the default so unknown statuses are shown as-is
+_stock_label = _STOCK_STATUS_LABELS.get
+
+_PRODUCT_DETAILS_FMT = (
+    "**{name}** (ID: {product_id})\n"
+    "Price: ${price:.2f} | Stock: {stock}\n"
+    "Description: {description}\n"
+    "How many units would you like to order?"
+)
+
+_PRODUCT_ROW_FMT = "{i}. **{name}** (ID: {product_id}) - ${price:.2f} | {stock}"
+
+
 class RAGAgent:
     """
     RAG Agent for answering product-related queries.
@@ -38,6 +136,9 @@ class RAGAgent:
         temperature: float = 0,
         k: int = 5,
         timeout: int = 60,
+        use_cache: bool = True,
+        cache_distance_threshold: float = 0.08,
+        cache_max_age: float = 60 * 60,
     ):
         """
         Initialize the RAG Agent.
@@ -47,22 +148,62 @@ class RAGAgent:
             temperature: Sampling temperature (0 = deterministic)
             k: Number of products to retrieve from vector store
             timeout: Request timeout in seconds (default: 60)
+            use_cache: Reuse answers to semantically similar standalone queries
+            cache_distance_threshold: Maximum cosine distance between queries for a cache hit
+            cache_max_age: Seconds a cached answer is reused before prices and
+                stock are looked up again
         """
         self.model_name = model_name
         self.temperature = temperature
         self.k = k
         self.timeout = timeout
-        self.vector_store = ProductVectorStore().get()
-        self.product_catalog = ProductCatalog()
-
-        def format_stock_status(stock_status: str) -> str:
-            """Format stock status for display."""
-            status_map = {
-                "in_stock": "In Stock",
-                "low_stock": "Low Stock",
-                "out_of_stock": "Out of Stock",
-            }
-            return status_map.get(stock_status, stock_status)
+        self.vector_store = get_product_vector_store()
+        self.product_catalog = get_product_catalog()
+        self.cache = (
+            SemanticCache(
+                self.vector_store.embeddings,
+                collection_name="rag-responses",
+                distance_threshold=cache_distance_threshold,
+                max_age=cache_max_age,
+            )
+            if use_cache
+            else None
+        )
+
+        def format_product_details(product: Dict) -> str:
+            """Format an exact product match with full details."""
+            logger.info("Exact product match found: %s", product["product_id"])
+            return _PRODUCT_DETAILS_FMT.format_map(
+                {
+                    **product,
+                    "stock": _stock_label(
+                        product["stock_status"], product["stock_status"]
+                    ),
+                }
+            )
+
+        def format_search_results(query: str, results: List[Document]) -> str:
+            """Format semantic search results as a numbered list."""
+            if not results:
+                return "No products found matching your search."
+
+            text = "\n".join(
+                _PRODUCT_ROW_FMT.format_map(
+                    {
+                        **doc.metadata,
+                        "i": i,
+                        "stock": _stock_label(
+                            doc.metadata["stock_status"], doc.metadata["stock_status"]
+                        ),
+                    }
+                )
+                for i, doc in enumerate(results, 1)
+            )
+
+            logger.info(
+                "Semantic search returned %s results for '%s'", len(results), query
+            )
+            return text
 
         @tool
         def transfer_to_order_agent(reason: str) -> str:
@@ -82,19 +223,26 @@ class RAGAgent:
             Returns:
                 Confirmation message
             """
-            logger.info(f"Transfer to Order Agent requested: {reason}")
+            logger.info("Transfer to Order Agent requested: %s", reason)
             return f"TRANSFER_TO_ORDER: {reason}"
 
+        categories = {
+            category.lower(): category
+            for category in self.product_catalog.get_categories()
+        }
+
         @tool
-        def retrieve_products(query: str) -> str:
+        def retrieve_products(query: str, category: Optional[str] = None) -> str:
             """
             Retrieve product information to help answer customer queries.
 
             - If the query matches a product ID or exact name, return product details.
             - Otherwise, perform semantic search and return a list of relevant products.
+            - If a category is given, the semantic search only returns products in it.
 
             Args:
                 query: The customer's search query, product name, or product ID
+                category: Optional product category to restrict the search to
 
             Returns:
                 Formatted product information
@@ -102,95 +250,69 @@ class RAGAgent:
             product = self.product_catalog.get_product_by_id_or_name(query)
 
             if product:
-                name = product["name"]
-                pid = product["product_id"]
-                price = product["price"]
-                stock = format_stock_status(product["stock_status"])
-                description = product["description"]
-
-                logger.info(f"Exact product match found: {pid}")
-
-                return (
-                    f"**{name}** (ID: {pid})\n"
-                    f"Price: ${price:.2f} | Stock: {stock}\n"
-                    f"Description: {description}\n"
-                    f"How many units would you like to order?"
-                )
+                return format_product_details(product)
 
-            results = self.vector_store.similarity_search(query, k=self.k)
+            search_filter = None
+            if category:
+                if category.lower() in categories:
+                    search_filter = {"category": categories[category.lower()]}
+                else:
+                    logger.debug("Ignoring unknown category filter: %s", category)
 
-            if not results:
-                return "No products found matching your search."
+            results = self.vector_store.similarity_search(
+                query, k=self.k, filter=search_filter
+            )
+            return format_search_results(query, results)
 
-            lines = []
-            for i, doc in enumerate(results, 1):
-                meta = doc.metadata
-                lines.append(
-                    f"{i}. **{meta['name']}** (ID: {meta['product_id']}) "
-                    f"- ${meta['price']:.2f} | {format_stock_status(meta['stock_status'])}"
-                )
+        retrieve_products.description += "\n\nCategories: " + ", ".join(
+            categories.values()
+        )
 
-            logger.info(
-                f"Semantic search returned {len(results)} results for '{query}'"
+        @tool
+        def retrieve_products_batch(queries: List[str]) -> str:
+            """
+            Retrieve product information for several searches in one call.
+
+            Use this instead of calling retrieve_products repeatedly, for example when
+            comparing products or when the customer asks about several products at once.
+
+            Args:
+                queries: Search queries, product names, or product IDs
+
+            Returns:
+                Formatted product information for each query
+            """
+            sections = {}
+            semantic_queries = []
+            for query in queries:
+                product = self.product_catalog.get_product_by_id_or_name(query)
+                if product:
+                    sections[query] = format_product_details(product)
+                else:
+                    semantic_queries.append(query)
+
+            if semantic_queries:
+                # One embeddings request for all queries instead of one per query
+                vectors = self.vector_store.embeddings.embed_documents(semantic_queries)
+                for query, vector in zip(semantic_queries, vectors):
+                    results = self.vector_store.similarity_search_by_vector(
+                        vector, k=self.k
+                    )
+                    sections[query] = format_search_results(query, results)
+
+            return "\n\n".join(
+                f"Results for '{query}':\n{sections[query]}" for query in queries
             )
-            return "\n".join(lines)
-
-        model = ChatOpenAI(model=model_name, temperature=temperature, timeout=timeout)
-
-        system_prompt = (
-            "You are a helpful e-commerce product assistant. Your role is to help customers find products and answer questions about them. "
-            "\n\n"
-            "CRITICAL: ANTI-HALLUCINATION RULES\n"
-            "1. You must ALWAYS use the 'retrieve_products' tool to search for products. Do not answer from your internal knowledge.\n"
-            "2. The 'retrieve_products' tool is the SINGLE SOURCE OF TRUTH. If a product is not returned by the tool, IT DOES NOT EXIST.\n"
-            "3. You must ONLY recommend products that are explicitly listed in the 'retrieve_products' tool output.\n"
-            "4. NEVER invent, guess, or assume product details, prices, features, or availability. If it's not in the tool output, don't say it.\n"
-            "5. Check the Product IDs. If you are about to suggest a product that doesn't have a matching ID in the tool output, STOP. Do not include it.\n"
-            "6. If the tool returns no results, state clearly that you couldn't find matches in the catalog.\n"
-            "\n"
-            "COMPARISON QUERIES:\n"
-            "When a user asks to compare products (e.g., 'How does X compare to Y?', 'which is better?'):\n"
-            "1. Call retrieve_products for EACH product being compared\n"
-            "2. Only compare attributes that are explicitly returned by the tool\n"
-            "3. If a product cannot be found, state that you cannot compare because the product was not found\n"
-            "4. NEVER make up specifications like processor details, weight, battery life, etc. unless returned by the tool\n"
-            "\n"
-            "TOOLS AVAILABLE:\n"
-            "1. retrieve_products - Search our product catalog\n"
-            "   Use this tool to search for products by name, category, features, or product ID\n"
-            "   The tool automatically formats results appropriately:\n"
-            "   - For browsing/searching: Returns numbered list format\n"
-            "   - For specific product queries: Returns detailed product information\n"
-            "\n"
-            "2. transfer_to_order_agent - Transfer customer to order specialist when they want to make a purchase\n"
-            "\n"
-            "WHEN TO TRANSFER:\n"
-            "- Customer wants to buy, purchase, or order a product\n"
-            "- Customer wants to add items to cart or checkout\n"
-            "- Customer wants to complete a purchase\n"
-            "When transferring, set 'transfer_to_agent' to 'order' and include a friendly message like 'Let me connect you with our order specialist to complete your purchase.'\n"
-            "\n"
-            "RESPONSE FORMAT:\n"
-            "You MUST provide a structured response with these fields:\n"
-            "- 'message': A friendly, conversational response to the customer's query\n"
-            "- 'products': List of ALL relevant products from retrieved results (with complete details: product_id, name, description, price, category, stock_status)\n"
-            "- 'transfer_to_agent': Set to 'order' when customer wants to purchase, otherwise None\n"
-            "\n"
-            "BEST PRACTICES:\n"
-            "- ALWAYS prominently display the Product ID in your message (e.g., 'MacBook Pro 16-inch (ID: TECH-001)')\n"
-            "- Format products clearly with ID first for easy reference when ordering\n"
-            "- ONLY include products truly relevant to the query (e.g., for 'laptops', exclude accessories)\n"
-            "- Highlight price, category, and stock status in your message\n"
-            "- Mention if products are out of stock and suggest alternatives\n"
-            "- Remind customers to use the Product ID when placing orders\n"
-            "- If no relevant products found, ask for clarification politely"
+
+        model = get_chat_model(
+            model_name, temperature, timeout, prompt_cache_key="ecommerce-bot-rag"
         )
 
         self.agent = create_agent(
             model,
-            tools=[retrieve_products, transfer_to_order_agent],
-            system_prompt=system_prompt,
-            response_format=RAGResponse,
+            tools=[retrieve_products, retrieve_products_batch, transfer_to_order_agent],
+            system_prompt=SYSTEM_PROMPT,
+            response_format=RAGAgentOutput,
             middleware=[
                 ModelCallLimitMiddleware(
                     run_limit=5,
@@ -200,7 +322,11 @@ class RAGAgent:
         )
 
         logger.info(
-            f"RAG Agent initialized with model={model_name}, temperature={temperature}, k={k}, timeout={timeout}s"
+            "RAG Agent initialized with model=%s, temperature=%s, k=%s, timeout=%ss",
+            model_name,
+            temperature,
+            k,
+            timeout,
         )
 
     def invoke(
@@ -216,37 +342,128 @@ class RAGAgent:
         Returns:
             RAGResponse with structured answer and products
         """
-        logger.info(f"Processing query: '{user_query}'")
+        logger.info("Processing query: '%s'", user_query)
+
+        if self._is_trivial(user_query):
+            return _GREETING_RESPONSE
+
+        cache_key = self._cache_key(user_query, chat_history)
+        if cache_key:
+            cached = self.cache.lookup(cache_key)
+            if cached:
+                logger.info("Answered query from semantic cache")
+                return RAGResponse.model_validate_json(cached)
 
-        messages = chat_history.copy() if chat_history else []
-        messages.append({"role": "user", "content": user_query})
+        messages = self._build_messages(user_query, chat_history)
 
         try:
             result = self.agent.invoke({"messages": messages})
         except Exception as e:
-            logger.error(f"Error invoking RAG agent: {e}", exc_info=True)
-            return RAGResponse(
-                message="I encountered an error searching for products. Please try again.",
-                products=[],
+            logger.error("Error invoking RAG agent: %s", e, exc_info=True)
+            return _ERROR_RESPONSE
+
+        response = self._handle_result(result)
+        if self._should_cache(cache_key, response):
+            self.cache.store(cache_key, response.model_dump_json())
+        return response
+
+    async def ainvoke(
+        self, user_query: str, chat_history: Optional[List[Dict]] = None
+    ) -> RAGResponse:
+        """
+        Answer user query using the agent without blocking the event loop.
+
+        Args:
+            user_query: User's question or search query
+            chat_history: Optional list of previous messages in conversation
+
+        Returns:
+            RAGResponse with structured answer and products
+        """
+        logger.info("Processing query: '%s'", user_query)
+
+        if self._is_trivial(user_query):
+            return _GREETING_RESPONSE
+
+        cache_key = self._cache_key(user_query, chat_history)
+        if cache_key:
+            # Cache lookups embed the query, which is a blocking HTTP call
+            cached = await asyncio.to_thread(self.cache.lookup, cache_key)
+            if cached:
+                logger.info("Answered query from semantic cache")
+                return RAGResponse.model_validate_json(cached)
+
+        messages = self._build_messages(user_query, chat_history)
+
+        try:
+            result = await self.agent.ainvoke({"messages": messages})
+        except Exception as e:
+            logger.error("Error invoking RAG agent: %s", e, exc_info=True)
+            return _ERROR_RESPONSE
+
+        response = self._handle_result(result)
+        if self._should_cache(cache_key, response):
+            await asyncio.to_thread(
+                self.cache.store, cache_key, response.model_dump_json()
             )
+        return response
+
+    @staticmethod
+    def _is_trivial(user_query: str) -> bool:
+        """Check whether a query is empty or a bare greeting that needs no search."""
+        query = user_query.strip().lower()
+        return len(query) < 2 or query in _GREETINGS
+
+    def _cache_key(
+        self, user_query: str, chat_history: Optional[List[Dict]]
+    ) -> Optional[str]:
+        """Return the cache key for a query, or None if the answer must not be cached."""
+        # Answers that depend on earlier turns are never cached
+        if self.cache is None or chat_history:
+            return None
+        return " ".join(user_query.lower().split())
+
+    @staticmethod
+    def _should_cache(cache_key: Optional[str], response: RAGResponse) -> bool:
+        """Check whether a response may be stored in the semantic cache."""
+        return (
+            bool(cache_key)
+            and response is not _FALLBACK_RESPONSE
+            and not response.transfer_to_agent
+        )
 
+    @staticmethod
+    def _build_messages(
+        user_query: str, chat_history: Optional[List[Dict]]
+    ) -> List[Dict]:
+        """Build the agent input messages from the chat history and the new query."""
+        return [*(chat_history or ()), {"role": "user", "content": user_query}]
+
+    def _handle_result(self, result: Dict) -> RAGResponse:
+        """Build the response from an agent result, filling in product details from the catalog."""
         structured_response = result.get("structured_response")
 
         if not structured_response:
             logger.debug(
                 "RAG Agent did not return a structured response - LLM may have had trouble determining intent"
             )
-            return RAGResponse(
-                message=(
-                    "I'm having trouble understanding your search. Could you try rephrasing?\n"
-                    "• Try being more specific about what you're looking for\n"
-                    "• You can search by product name, category, or features\n"
-                    "• For example: 'show me laptops' or 'wireless headphones under $100'"
-                ),
-                products=[],
-            )
+            return _FALLBACK_RESPONSE
 
-        logger.info(
-            f"Successfully answered query with {len(structured_response.products)} products"
+        raw_products = []
+        for product_id in dict.fromkeys(structured_response.product_ids):
+            product = self.product_catalog.get_product(product_id)
+            if product:
+                raw_products.append(product)
+            else:
+                logger.debug(
+                    "Dropping unknown product ID from response: %s", product_id
+                )
+        products = PRODUCTS_ADAPTER.validate_python(raw_products)
+
+        logger.info("Successfully answered query with %s products", len(products))
+        # Every field is already validated, so skip validating it all again
+        return RAGResponse.model_construct(
+            message=structured_response.message,
+            transfer_to_agent=structured_response.transfer_to_agent,
+            products=products,
         )
-        return structured_response
@@ -38,8 +38,8 @@ print(banner)
 try:
     from IPython import embed
 
-    embed(colors="neutral")
+    embed(user_ns={"orders": orders, "products": products}, colors="neutral")
 except ImportError:
     import code
 
-    code.interact(local=locals(), banner="")
+    code.interact(local={"orders": orders, "products": products}, banner="")
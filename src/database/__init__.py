@@ -1,6 +1,41 @@
 """Database module for orders and product vector store."""
 
+from importlib import import_module
+
 from .orders import OrderDatabase
-from .products import ProductCatalog, ProductVectorStore
+from .products import ProductCatalog, get_product_catalog
+
+# Names whose modules import chromadb or LangChain.
+# They are resolved on first access so importing the package for orders or
+# the catalog (e.g. from the console) does not load the embedding stack.
+_LAZY_ATTRIBUTES = {
+    "CachedEmbeddings": ".embeddings",
+    "get_embeddings": ".embeddings",
+    "ProductVectorStore": ".vector_store",
+    "get_product_vector_store": ".vector_store",
+    "SemanticCache": ".semantic_cache",
+    "SQLiteLLMCache": ".llm_cache",
+}
+
+__all__ = [
+    "CachedEmbeddings",
+    "OrderDatabase",
+    "ProductCatalog",
+    "ProductVectorStore",
+    "SQLiteLLMCache",
+    "SemanticCache",
+    "get_embeddings",
+    "get_product_catalog",
+    "get_product_vector_store",
+]
+
+
+def __getattr__(name: str):
+    """Import lazily exported names on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = ["OrderDatabase", "ProductCatalog", "ProductVectorStore"]
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,135 @@
+"""Shared embedding models with an in-memory cache for text embeddings."""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that reuses vectors for texts it has already embedded.
+
+    Repeated queries (e.g. "show me laptops" asked in several sessions) are
+    answered from an LRU cache keyed by the exact text instead of calling
+    the embeddings API again.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_size: int = 2048):
+        """
+        Initialize CachedEmbeddings.
+
+        Args:
+            embeddings: Underlying embedding model
+            max_size: Maximum number of cached vectors before the least recently used are evicted
+        """
+        self.embeddings = embeddings
+        self.max_size = max_size
+        self._cache: OrderedDict[str, List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, using the cached vector if the text was seen before.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
+        """
+        embedding = self._get(text)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(text)
+            self._put(text, embedding)
+        return embedding
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, sending only uncached texts to the underlying model in one batch.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors in the same order as texts
+        """
+        found = self._get_many(texts)
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing:
+            for text, embedding in zip(
+                missing, self.embeddings.embed_documents(missing)
+            ):
+                self._put(text, embedding)
+                found[text] = embedding
+        return [found[text] for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async version of embed_query."""
+        embedding = self._get(text)
+        if embedding is None:
+            embedding = await self.embeddings.aembed_query(text)
+            self._put(text, embedding)
+        return embedding
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async version of embed_documents."""
+        found = self._get_many(texts)
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing:
+            embeddings = await self.embeddings.aembed_documents(missing)
+            for text, embedding in zip(missing, embeddings):
+                self._put(text, embedding)
+                found[text] = embedding
+        return [found[text] for text in texts]
+
+    def _get(self, text: str) -> Optional[List[float]]:
+        """Return the cached vector for a text and mark it as recently used."""
+        with self._lock:
+            embedding = self._cache.get(text)
+            if embedding is not None:
+                self._cache.move_to_end(text)
+            return embedding
+
+    def _get_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for the texts that are in the cache."""
+        with self._lock:
+            found = {}
+            for text in texts:
+                embedding = self._cache.get(text)
+                if embedding is not None:
+                    self._cache.move_to_end(text)
+                    found[text] = embedding
+            return found
+
+    def _put(self, text: str, embedding: List[float]):
+        """Cache a vector, evicting the least recently used one when full."""
+        with self._lock:
+            self._cache[text] = embedding
+            self._cache.move_to_end(text)
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+
+@lru_cache(maxsize=4)
+def get_embeddings(model: str = "text-embedding-3-small") -> CachedEmbeddings:
+    """
+    Get the shared embedding model for an OpenAI embeddings model name.
+
+    All vector stores and caches using the same model share one HTTP client
+    and one embedding cache.
+
+    Args:
+        model: OpenAI embedding model to use
+
+    Returns:
+        Shared CachedEmbeddings instance
+    """
+    return CachedEmbeddings(OpenAIEmbeddings(model=model))
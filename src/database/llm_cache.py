@@ -0,0 +1,102 @@
+"""Exact-match LLM response cache stored in SQLite."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    LangChain LLM cache that persists model responses in a SQLite file.
+
+    Responses are keyed by a hash of the exact prompt and model configuration,
+    so only byte-identical requests (same messages, tools, model and
+    parameters) are answered from the cache. Entries survive restarts, which
+    makes replaying the same conversations (e.g. examples/test_conversations.md)
+    free after the first run.
+    """
+
+    def __init__(self, database_path: str = "data/llm_cache.db"):
+        """
+        Initialize SQLiteLLMCache.
+
+        Args:
+            database_path: Path to the SQLite cache file
+        """
+        Path(database_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+            )
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """
+        Look up a cached response.
+
+        Args:
+            prompt: Serialized prompt
+            llm_string: Serialized model configuration
+
+        Returns:
+            Cached generations or None on a miss
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM llm_cache WHERE key = ?",
+                (self._key(prompt, llm_string),),
+            ).fetchone()
+        if row is None:
+            return None
+
+        try:
+            return [loads(generation) for generation in json.loads(row[0])]
+        except Exception as e:
+            logger.warning("Ignoring unreadable LLM cache entry: %s", e)
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        """
+        Cache a response.
+
+        Args:
+            prompt: Serialized prompt
+            llm_string: Serialized model configuration
+            return_val: Generations returned by the model
+        """
+        response = json.dumps([dumps(generation) for generation in return_val])
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response) VALUES (?, ?)",
+                (self._key(prompt, llm_string), response),
+            )
+
+    def clear(self, **kwargs: Any):
+        """Delete all cached responses."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_cache")
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        """Hash the prompt and model configuration into a fixed-size key."""
+        # The agent graph gives every message a random ID; drop them so the
+        # same conversation produces the same key
+        try:
+            messages = json.loads(prompt)
+            for message in messages:
+                message.get("kwargs", {}).pop("id", None)
+            prompt = json.dumps(messages, sort_keys=True)
+        except (ValueError, TypeError, AttributeError):
+            pass
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
@@ -1,22 +1,65 @@
 """Database module for order management using SQLAlchemy ORM."""
 
-import uuid
-from datetime import datetime
-from typing import List, Optional
+import secrets
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 
 from sqlalchemy import (
     Column,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
+    bindparam,
     create_engine,
+    event,
+    func,
+    insert,
+    select,
+    text,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.orm import (
+    Session,
+    declarative_base,
+    joinedload,
+    relationship,
+    selectinload,
+    sessionmaker,
 )
-from sqlalchemy.orm import Session, declarative_base, relationship, sessionmaker
 
 Base = declarative_base()
 
+# Current UTC time with millisecond precision, generated by SQLite itself
+# (CURRENT_TIMESTAMP only has whole seconds)
+_NOW = func.strftime("%Y-%m-%d %H:%M:%f", "now")
+_NOW_DDL = text("(strftime('%Y-%m-%d %H:%M:%f', 'now'))")
+
+# WAL lets readers run alongside the writer, and with synchronous=NORMAL a
+# commit no longer waits for an fsync of the main database file. The page
+# cache is per connection, so it is kept small (4 MB) for the whole pool.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-4000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply performance pragmas to each new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 class Order(Base):
     """Order table schema."""
@@ -29,13 +72,35 @@ class Order(Base):
     customer_email = Column(String, nullable=False)
     total_amount = Column(Float, nullable=False)
     status = Column(String, default="pending", nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Timestamps are generated by SQLite (UTC). server_default puts the default
+    # in the table definition; default also sends it in each INSERT, because
+    # tables created before it was added have no column default
+    created_at = Column(
+        DateTime,
+        default=_NOW,
+        server_default=_NOW_DDL,
+        nullable=False,
+        index=True,
+    )
+    updated_at = Column(
+        DateTime,
+        default=_NOW,
+        server_default=_NOW_DDL,
+        onupdate=_NOW,
+    )
 
     items = relationship(
         "OrderItem", back_populates="order", cascade="all, delete-orphan"
     )
 
+    # Serves get_orders_by_email's filter and newest-first sort in one index scan;
+    # id breaks ties between orders created within the same millisecond
+    __table_args__ = (
+        Index("ix_orders_email_created", customer_email, created_at.desc(), id.desc()),
+    )
+    # Read the generated timestamps back with RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<Order(order_id='{self.order_id}', customer='{self.customer_name}', total={self.total_amount})>"
 
@@ -59,6 +124,14 @@ class OrderItem(Base):
         return f"<OrderItem(product='{self.product_name}', qty={self.quantity}, subtotal={self.subtotal})>"
 
 
+# Built once at import; each call only binds the order ID
+_ORDER_BY_ORDER_ID = (
+    select(Order)
+    .options(joinedload(Order.items))
+    .where(Order.order_id == bindparam("order_id"))
+)
+
+
 class OrderDatabase:
     """Database manager for order operations."""
 
@@ -68,13 +141,44 @@ class OrderDatabase:
         Args:
             db_path: Path to SQLite database file
         """
-        self.engine = create_engine(f"sqlite:///{db_path}", echo=False)
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            echo=False,
+            # SQLite serializes writers, so a few connections are enough
+            pool_size=4,
+            max_overflow=4,
+            # Pooled connections are handed to whichever thread checks them out
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
         Base.metadata.create_all(self.engine)
-        self.SessionLocal = sessionmaker(bind=self.engine)
+        # create_all skips existing tables, so add indexes introduced later
+        for index in Order.__table__.indexes:
+            index.create(self.engine, checkfirst=True)
+        # Returned orders stay readable after their session is closed
+        self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """Provide a session that commits on success, rolls back on error, and is always closed."""
+        session = self.SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
 
-    def _get_session(self) -> Session:
-        """Create a new database session."""
-        return self.SessionLocal()
+    @staticmethod
+    def _get_by_order_id(session: Session, order_id: str) -> Optional[Order]:
+        """Load an order and its items by order_id."""
+        return (
+            session.execute(_ORDER_BY_ORDER_ID, {"order_id": order_id})
+            .unique()
+            .scalar_one_or_none()
+        )
 
     def create_order(
         self,
@@ -103,44 +207,39 @@ class OrderDatabase:
             ... ]
             >>> order = db.create_order("John Doe", "john@example.com", items)
         """
-        session = self._get_session()
-        try:
-            order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
-            total_amount = sum(item["quantity"] * item["unit_price"] for item in items)
-
-            order = Order(
-                order_id=order_id,
-                customer_name=customer_name,
-                customer_email=customer_email,
-                total_amount=total_amount,
-                status="pending",
-            )
-
-            for item in items:
-                order_item = OrderItem(
-                    order_id=order_id,
-                    product_id=item["product_id"],
-                    product_name=item["product_name"],
-                    quantity=item["quantity"],
-                    unit_price=item["unit_price"],
-                    subtotal=item["quantity"] * item["unit_price"],
-                )
-                order.items.append(order_item)
-
+        # Millisecond timestamp prefix keeps inserts into the order_id index in order
+        order_id = f"ORD-{time.time_ns() // 1_000_000:X}{secrets.token_hex(2).upper()}"
+        total_amount = sum(item["quantity"] * item["unit_price"] for item in items)
+
+        order = Order(
+            order_id=order_id,
+            customer_name=customer_name,
+            customer_email=customer_email,
+            total_amount=total_amount,
+            status="pending",
+        )
+
+        item_rows = [
+            {
+                "order_id": order_id,
+                "product_id": item["product_id"],
+                "product_name": item["product_name"],
+                "quantity": item["quantity"],
+                "unit_price": item["unit_price"],
+                "subtotal": item["quantity"] * item["unit_price"],
+            }
+            for item in items
+        ]
+
+        with self._session() as session:
             session.add(order)
-            session.commit()
-            session.refresh(order)
-
-            # Eagerly load items before closing session
-            _ = order.items
-
-            return order
+            session.flush()
+            # A single executemany INSERT instead of one INSERT per ORM object
+            if item_rows:
+                session.execute(insert(OrderItem), item_rows)
+            session.refresh(order, ["items"])
 
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+        return order
 
     def get_order_by_id(self, order_id: str) -> Optional[Order]:
         """Retrieve an order by its order_id.
@@ -151,14 +250,8 @@ class OrderDatabase:
         Returns:
             Order object if found, None otherwise
         """
-        session = self._get_session()
-        try:
-            order = session.query(Order).filter(Order.order_id == order_id).first()
-            if order:
-                _ = order.items
-            return order
-        finally:
-            session.close()
+        with self._session() as session:
+            return self._get_by_order_id(session, order_id)
 
     def get_all_orders(self, limit: int = 100) -> List[Order]:
         """Retrieve all orders, most recent first.
@@ -169,19 +262,51 @@ class OrderDatabase:
         Returns:
             List of Order objects
         """
-        session = self._get_session()
-        try:
-            orders = (
+        with self._session() as session:
+            return (
                 session.query(Order)
-                .order_by(Order.created_at.desc())
+                .options(selectinload(Order.items))
+                .order_by(Order.created_at.desc(), Order.id.desc())
                 .limit(limit)
                 .all()
             )
-            for order in orders:
-                _ = order.items
-            return orders
-        finally:
-            session.close()
+
+    def iter_orders(self, page_size: int = 200) -> Iterator[Order]:
+        """Iterate over all orders, most recent first, one page at a time.
+
+        Pages are fetched with keyset pagination on (created_at, id), so each
+        query seeks past the previous page instead of scanning an OFFSET, and
+        only one page of orders is held in memory. Each page uses its own
+        session, which is closed before its orders are yielded.
+
+        Args:
+            page_size: Number of orders loaded per query
+
+        Yields:
+            Order objects with their items loaded
+        """
+        # Compare created_at as the stored text so the cursor matches rows
+        # exactly, whatever precision each row was written with
+        created_at = type_coerce(Order.created_at, String)
+        cursor = None
+        while True:
+            with self._session() as session:
+                query = (
+                    session.query(Order, created_at)
+                    .options(selectinload(Order.items))
+                    .order_by(Order.created_at.desc(), Order.id.desc())
+                )
+                if cursor is not None:
+                    query = query.filter(tuple_(created_at, Order.id) < cursor)
+                page = query.limit(page_size).all()
+
+            for order, _ in page:
+                yield order
+
+            if len(page) < page_size:
+                return
+            last_order, last_created_at = page[-1]
+            cursor = (last_created_at, last_order.id)
 
     def get_last_order(self) -> Optional[Order]:
         """Retrieve the most recently created order.
@@ -189,18 +314,13 @@ class OrderDatabase:
         Returns:
             Most recent Order object if found, None otherwise
         """
-        session = self._get_session()
-        try:
-            order = (
+        with self._session() as session:
+            return (
                 session.query(Order)
-                .order_by(Order.created_at.desc())
+                .options(joinedload(Order.items))
+                .order_by(Order.created_at.desc(), Order.id.desc())
                 .first()
             )
-            if order:
-                _ = order.items
-            return order
-        finally:
-            session.close()
 
     def get_orders_by_email(self, email: str) -> List[Order]:
         """Retrieve all orders for a specific customer email.
@@ -211,19 +331,14 @@ class OrderDatabase:
         Returns:
             List of Order objects
         """
-        session = self._get_session()
-        try:
-            orders = (
+        with self._session() as session:
+            return (
                 session.query(Order)
+                .options(selectinload(Order.items))
                 .filter(Order.customer_email == email)
-                .order_by(Order.created_at.desc())
+                .order_by(Order.created_at.desc(), Order.id.desc())
                 .all()
             )
-            for order in orders:
-                _ = order.items
-            return orders
-        finally:
-            session.close()
 
     def update_order_status(self, order_id: str, status: str) -> Optional[Order]:
         """Update the status of an order.
@@ -235,21 +350,11 @@ class OrderDatabase:
         Returns:
             Updated Order object if found, None otherwise
         """
-        session = self._get_session()
-        try:
-            order = session.query(Order).filter(Order.order_id == order_id).first()
+        with self._session() as session:
+            order = self._get_by_order_id(session, order_id)
             if order:
                 order.status = status
-                order.updated_at = datetime.utcnow()
-                session.commit()
-                session.refresh(order)
-                _ = order.items
             return order
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
 
     def delete_order(self, order_id: str) -> bool:
         """Delete an order and its items (cascade).
@@ -260,19 +365,12 @@ class OrderDatabase:
         Returns:
             True if deleted, False if not found
         """
-        session = self._get_session()
-        try:
-            order = session.query(Order).filter(Order.order_id == order_id).first()
+        with self._session() as session:
+            order = self._get_by_order_id(session, order_id)
             if order:
                 session.delete(order)
-                session.commit()
                 return True
             return False
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
 
     def get_order_count(self) -> int:
         """Get total number of orders in database.
@@ -280,8 +378,5 @@ class OrderDatabase:
         Returns:
             Count of orders
         """
-        session = self._get_session()
-        try:
+        with self._session() as session:
             return session.query(Order).count()
-        finally:
-            session.close()
@@ -0,0 +1,151 @@
+"""Semantic response cache backed by an in-process ChromaDB collection."""
+
+import hashlib
+import re
+import time
+from typing import Dict, Optional
+
+import chromadb
+from langchain_core.embeddings import Embeddings
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Product IDs (e.g. "tech-001") and numbers (quantities, prices) in a query.
+# Queries differing only in these embed almost identically, so a cache hit
+# also requires them to match exactly.
+_KEY_TOKEN_PATTERN = re.compile(r"[a-z]{2,}-\d+|\d[\d,]*(?:\.\d+)?")
+
+
+class SemanticCache:
+    """
+    Caches responses keyed by the embedding of the query that produced them.
+
+    A lookup returns the stored response of the closest previous query when it
+    lies within ``distance_threshold`` (cosine distance), so paraphrased
+    questions can be answered without another LLM round trip. Product IDs and
+    numbers in the query must match the cached query exactly, so "price of
+    TECH-001" never returns the answer for TECH-002.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        collection_name: str = "semantic_cache",
+        distance_threshold: float = 0.08,
+        max_entries: int = 1000,
+        max_age: Optional[float] = None,
+    ):
+        """
+        Initialize SemanticCache.
+
+        Args:
+            embeddings: Embedding model used to embed queries (wrap it in
+                CachedEmbeddings so lookup and store share one embedding call)
+            collection_name: Name of the cache collection
+            distance_threshold: Maximum cosine distance for a cache hit
+            max_entries: Maximum number of cached responses before the oldest are evicted
+            max_age: Maximum age in seconds of a cached response to be returned
+                (no limit if None)
+        """
+        self.embeddings = embeddings
+        self.distance_threshold = distance_threshold
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._collection = chromadb.EphemeralClient().get_or_create_collection(
+            collection_name, configuration={"hnsw": {"space": "cosine"}}
+        )
+
+    def lookup(self, query: str, where: Optional[Dict] = None) -> Optional[str]:
+        """
+        Find a cached response for a semantically similar query.
+
+        Args:
+            query: Query to look up
+            where: Optional metadata filter the cached entry must match
+
+        Returns:
+            Cached response or None on a miss
+        """
+        try:
+            if self._collection.count() == 0:
+                return None
+
+            conditions = [{"key_tokens": self._key_tokens(query)}]
+            if where:
+                conditions.append(where)
+            if self.max_age is not None:
+                conditions.append({"created_at": {"$gte": time.time() - self.max_age}})
+            where = conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+            result = self._collection.query(
+                query_embeddings=[self.embeddings.embed_query(query)],
+                n_results=1,
+                where=where,
+                include=["documents", "distances"],
+            )
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed: %s", e)
+            return None
+
+        if not result["ids"][0]:
+            return None
+
+        distance = result["distances"][0][0]
+        if distance > self.distance_threshold:
+            return None
+
+        logger.debug("Semantic cache hit for '%s' (distance=%.4f)", query, distance)
+        return result["documents"][0][0]
+
+    def store(self, query: str, response: str, metadata: Optional[Dict] = None):
+        """
+        Cache a response for a query.
+
+        Args:
+            query: Query that produced the response
+            response: Serialized response to cache
+            metadata: Optional metadata used to filter lookups
+        """
+        metadata = dict(metadata or {})
+        key = hashlib.sha256(f"{query}|{sorted(metadata.items())}".encode()).hexdigest()
+
+        try:
+            if self._collection.count() >= self.max_entries:
+                self._evict()
+
+            self._collection.upsert(
+                ids=[key],
+                embeddings=[self.embeddings.embed_query(query)],
+                documents=[response],
+                metadatas=[
+                    {
+                        **metadata,
+                        "query": query,
+                        "key_tokens": self._key_tokens(query),
+                        "created_at": time.time(),
+                    }
+                ],
+            )
+        except Exception as e:
+            logger.warning("Semantic cache store failed: %s", e)
+
+    @staticmethod
+    def _key_tokens(query: str) -> str:
+        """Return the product IDs and numbers in a query, normalized and sorted."""
+        tokens = {
+            token.replace(",", "")
+            for token in _KEY_TOKEN_PATTERN.findall(query.lower())
+        }
+        return " ".join(sorted(tokens))
+
+    def _evict(self):
+        """Delete the oldest entries so a new one fits within max_entries."""
+        entries = self._collection.get(include=["metadatas"])
+        by_age = sorted(
+            zip(entries["ids"], entries["metadatas"]),
+            key=lambda entry: entry[1]["created_at"],
+        )
+        overflow = len(by_age) - self.max_entries + 1
+        self._collection.delete(ids=[key for key, _ in by_age[:overflow]])
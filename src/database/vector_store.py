@@ -0,0 +1,252 @@
+"""Product vector store backed by ChromaDB."""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+import chromadb
+from chromadb.api.client import SharedSystemClient
+from langchain_chroma import Chroma
+
+from utils.logger import setup_logger
+
+from .embeddings import get_embeddings
+
+logger = setup_logger(__name__)
+
+
+class ProductVectorStore:
+    """Manages ChromaDB vector store for product embeddings."""
+
+    def __init__(
+        self,
+        persist_directory: str = "data/chroma_db",
+        collection_name: str = "products",
+        embedding_model: str = "text-embedding-3-small",
+    ):
+        """
+        Initialize ProductVectorStore.
+
+        Args:
+            persist_directory: Path to ChromaDB persistent storage
+            collection_name: Name of the collection
+            embedding_model: OpenAI embedding model to use
+        """
+        self.persist_directory = persist_directory
+        self.collection_name = collection_name
+        self.embedding_model = embedding_model
+        self.embeddings = get_embeddings(embedding_model)
+
+    def initialize(
+        self,
+        products_path: str = "data/products.json",
+        batch_size: int = 256,
+        max_workers: int = 4,
+    ) -> Chroma:
+        """
+        Initialize or reset vector store with product embeddings.
+
+        Products are embedded in batches, with up to max_workers embedding
+        requests in flight at once, and each batch is written as soon as its
+        embeddings arrive. Products whose name and description are unchanged
+        since the last build reuse their stored embeddings. The new store is
+        built in a sibling directory and swapped in only once complete, so a
+        failed rebuild leaves the existing store untouched.
+
+        Args:
+            products_path: Path to products.json file
+            batch_size: Number of products per embeddings request
+            max_workers: Maximum number of concurrent embeddings requests
+
+        Returns:
+            Chroma vector store with embedded products
+
+        Raises:
+            FileNotFoundError: If products.json doesn't exist
+        """
+        products_file = Path(products_path)
+        if not products_file.exists():
+            raise FileNotFoundError(f"Products file not found: {products_path}")
+
+        with open(products_file) as f:
+            products = json.load(f)
+
+        logger.info("Loaded %s products from %s", len(products), products_path)
+
+        ids = []
+        texts = []
+        metadatas = []
+        for product in products:
+            text = f"{product['name']}. {product['description']}"
+            ids.append(product["product_id"])
+            texts.append(text)
+            metadatas.append(
+                {
+                    "product_id": product["product_id"],
+                    "name": product["name"],
+                    "price": product["price"],
+                    "category": product["category"],
+                    "stock_status": product["stock_status"],
+                    "description": product["description"],
+                    "content_hash": hashlib.blake2b(
+                        text.encode(), digest_size=8
+                    ).hexdigest(),
+                }
+            )
+
+        reused = self._load_unchanged_embeddings(ids, metadatas)
+        logger.info(
+            "Reusing embeddings for %s of %s products", len(reused), len(products)
+        )
+
+        # Build next to the live store so readers keep working until the
+        # finished store is swapped in with a same-filesystem rename
+        persist_path = Path(self.persist_directory)
+        persist_path.parent.mkdir(parents=True, exist_ok=True)
+        build_path = Path(
+            tempfile.mkdtemp(
+                prefix=f"{persist_path.name}.build-", dir=persist_path.parent
+            )
+        )
+        try:
+            self._build_collection(
+                build_path, ids, texts, metadatas, reused, batch_size, max_workers
+            )
+        except BaseException:
+            shutil.rmtree(build_path, ignore_errors=True)
+            raise
+
+        backup_path = persist_path.with_name(f"{persist_path.name}.bak")
+        shutil.rmtree(backup_path, ignore_errors=True)
+        if persist_path.exists():
+            os.replace(persist_path, backup_path)
+        os.replace(build_path, persist_path)
+        shutil.rmtree(backup_path, ignore_errors=True)
+
+        # chromadb keeps one client per path; drop it so get() opens the new files
+        SharedSystemClient.clear_system_cache()
+
+        logger.info("Added %s products to vector store", len(ids))
+        logger.info("Collection saved to %s", self.persist_directory)
+
+        return self.get()
+
+    def _load_unchanged_embeddings(
+        self, ids: List[str], metadatas: List[Dict]
+    ) -> Dict[str, List[float]]:
+        """Return stored embeddings of products whose content hash still matches."""
+        if not Path(self.persist_directory).exists():
+            return {}
+
+        try:
+            client = chromadb.PersistentClient(path=self.persist_directory)
+            collection = client.get_collection(self.collection_name)
+        except Exception as e:
+            logger.warning("Could not open existing vector store: %s", e)
+            return {}
+
+        # Vectors from a different embedding model are not comparable
+        if (collection.metadata or {}).get("embedding_model") != self.embedding_model:
+            return {}
+
+        hashes = {
+            product_id: metadata["content_hash"]
+            for product_id, metadata in zip(ids, metadatas)
+        }
+        existing = collection.get(ids=ids, include=["embeddings", "metadatas"])
+        return {
+            product_id: embedding
+            for product_id, metadata, embedding in zip(
+                existing["ids"], existing["metadatas"], existing["embeddings"]
+            )
+            if metadata.get("content_hash") == hashes[product_id]
+        }
+
+    def _build_collection(
+        self,
+        path: Path,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict],
+        reused: Dict[str, List[float]],
+        batch_size: int,
+        max_workers: int,
+    ):
+        """Write products to a new collection at path, embedding only those not in reused."""
+        client = chromadb.PersistentClient(path=str(path))
+        collection = client.create_collection(
+            self.collection_name,
+            configuration={"hnsw": {"space": "cosine"}},
+            metadata={"embedding_model": self.embedding_model},
+        )
+
+        def add(batch: List[int], embeddings: List[List[float]]):
+            collection.add(
+                ids=[ids[i] for i in batch],
+                embeddings=embeddings,
+                metadatas=[metadatas[i] for i in batch],
+                documents=[texts[i] for i in batch],
+            )
+
+        unchanged = [i for i, product_id in enumerate(ids) if product_id in reused]
+        changed = [i for i, product_id in enumerate(ids) if product_id not in reused]
+
+        for start in range(0, len(unchanged), batch_size):
+            batch = unchanged[start : start + batch_size]
+            add(batch, [reused[ids[i]] for i in batch])
+
+        batches = [
+            changed[start : start + batch_size]
+            for start in range(0, len(changed), batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            embedded = executor.map(
+                lambda batch: self.embeddings.embed_documents(
+                    [texts[i] for i in batch]
+                ),
+                batches,
+            )
+            for batch, embeddings in zip(batches, embedded):
+                add(batch, embeddings)
+
+    def get(self) -> Chroma:
+        """
+        Get existing vector store collection.
+
+        Returns:
+            Chroma vector store
+
+        Raises:
+            ValueError: If collection doesn't exist
+        """
+        persist_path = Path(self.persist_directory)
+        if not persist_path.exists():
+            raise ValueError(
+                f"Vector store not found at {self.persist_directory}. "
+                f"Run initialize() first."
+            )
+
+        vector_store = Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self.embeddings,
+            persist_directory=self.persist_directory,
+        )
+
+        return vector_store
+
+
+@lru_cache(maxsize=None)
+def get_product_vector_store() -> Chroma:
+    """
+    Get the shared product vector store, opening it on first use.
+
+    Returns:
+        Chroma vector store shared by all agents
+    """
+    return ProductVectorStore().get()
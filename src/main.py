@@ -4,18 +4,58 @@ Interactive assistant for product search and order placement.
 """
 
 import argparse
+import asyncio
 import logging
-from typing import List
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Tuple
 
 from dotenv import load_dotenv
+from langchain_core.globals import set_llm_cache
 
 from agents.orchestrator import Orchestrator
+from database import SQLiteLLMCache
+from schema import OrchestratorResponse
 from utils.logger import setup_logger
 from utils.spinner import Spinner
-import gradio as gr
 
 load_dotenv()
 
+# Opt-in exact-match cache of LLM responses, set before any agent is built so
+# every chat model picks it up. Useful for replaying the same test
+# conversations; off by default so normal runs always query the model.
+if os.getenv("LLM_CACHE") == "1":
+    set_llm_cache(SQLiteLLMCache("data/llm_cache.db"))
+
+logger = logging.getLogger("cli")
+
+# Conversation turns (user + assistant message pairs) kept per session; the
+# agents only read the most recent messages, so older ones are dropped
+MAX_HISTORY_TURNS = 12
+
+_EXIT_WORDS = frozenset(("exit", "quit"))
+
+_BANNER_RULE = "=" * 70
+_BANNER_HEAD = (
+    f"\n{_BANNER_RULE}\n"
+    "🛍️  Welcome to Our E-Commerce Store!\n"
+    f"{_BANNER_RULE}\n"
+    "I'm your AI shopping assistant. I can help you:\n"
+    "  • Search and browse products\n"
+    "  • Get detailed product information\n"
+    "  • Place orders with ease\n"
+    "\n"
+    "Commands:\n"
+    "  • Type 'exit' or 'quit' to end the conversation\n"
+)
+_BANNER = f"{_BANNER_HEAD}{_BANNER_RULE}"
+_VERBOSE_BANNER = (
+    f"{_BANNER_HEAD}"
+    "  • Verbose mode is enabled - debug info will be shown\n"
+    f"{_BANNER_RULE}"
+)
+
 
 def setup_logging(verbose: bool = False) -> logging.Logger:
     """
@@ -34,6 +74,8 @@ def setup_logging(verbose: bool = False) -> logging.Logger:
         "agents.orchestrator",
         "agents.rag_agent",
         "database.products",
+        "database.semantic_cache",
+        "database.vector_store",
     ]:
         setup_logger(component, level=log_level)
 
@@ -53,31 +95,36 @@ def run_cli(verbose: bool = False):
         Args:
             verbose: Whether verbose mode is enabled
         """
-        print("\n" + "=" * 70)
-        print("🛍️  Welcome to Our E-Commerce Store!")
-        print("=" * 70)
-        print("I'm your AI shopping assistant. I can help you:")
-        print("  • Search and browse products")
-        print("  • Get detailed product information")
-        print("  • Place orders with ease")
-        print()
-        print("Commands:")
-        print("  • Type 'exit' or 'quit' to end the conversation")
-        if verbose:
-            print("  • Verbose mode is enabled - debug info will be shown")
-        print("=" * 70)
+        print(_VERBOSE_BANNER if verbose else _BANNER)
 
     logger = setup_logging(verbose)
 
-    orchestrator = Orchestrator()
+    # Load the agents, vector store and catalog while the banner is shown
+    executor = ThreadPoolExecutor(max_workers=1)
+    orchestrator_future = executor.submit(Orchestrator)
+    executor.shutdown(wait=False)
+
     chat_history = []
 
     print_banner(verbose)
 
+    spinner = Spinner("Starting")
+    spinner.start()
+    try:
+        orchestrator = orchestrator_future.result()
+    except Exception as e:
+        spinner.stop()
+        logger.error("Failed to start: %s", e)
+        if verbose:
+            logger.exception("Full traceback:")
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+    spinner.stop()
+
     while True:
         user_input = input("\nYou: ").strip()
 
-        if user_input.lower() in ["exit", "quit"]:
+        if user_input.lower() in _EXIT_WORDS:
             print("\nThank you for shopping with us! Goodbye!")
             break
 
@@ -88,30 +135,51 @@ def run_cli(verbose: bool = False):
             spinner = Spinner("Processing")
             spinner.start()
 
+            streamed = ""
             try:
-                logger.debug(f"Orchestrator state: {orchestrator._state.value}")
-                logger.debug(f"Chat history length: {len(chat_history)}")
-
-                response = orchestrator.invoke(user_input, chat_history=chat_history)
-                response_message = response.message
+                logger.debug("Orchestrator state: %s", orchestrator._state.value)
+                logger.debug("Chat history length: %s", len(chat_history))
+
+                for item in orchestrator.stream(user_input, chat_history=chat_history):
+                    if isinstance(item, OrchestratorResponse):
+                        response = item
+                        continue
+
+                    # One write per delta; the label goes out with the first one
+                    if streamed:
+                        print(item, end="", flush=True)
+                    else:
+                        spinner.stop()
+                        print(f"Assistant: {item}", end="", flush=True)
+                    streamed += item
 
             finally:
                 spinner.stop()
 
-            print(f"Assistant: {response_message}")
-
-            chat_history.append({"role": "user", "content": user_input})
-            chat_history.append({"role": "assistant", "content": response_message})
+            # Replies that weren't streamed (checkout mode, errors before any
+            # text) are printed whole; streamed ones just end the line
+            response_message = response.message
+            if streamed:
+                print()
+            else:
+                print(f"Assistant: {response_message}")
+
+            chat_history.extend(
+                (
+                    {"role": "user", "content": user_input},
+                    {"role": "assistant", "content": response_message},
+                )
+            )
+            del chat_history[: -2 * MAX_HISTORY_TURNS]
 
         except KeyboardInterrupt:
             print("\n\nThank you for shopping with us! Goodbye!")
             break
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error("Error: %s", e)
             if verbose:
                 logger.exception("Full traceback:")
-            print(f"\n❌ Error: {e}")
-            print("Please try again.")
+            print(f"\n❌ Error: {e}\nPlease try again.")
 
 
 def run_web_ui(
@@ -124,40 +192,78 @@ def run_web_ui(
         server_port: Port to run the Gradio server on
         server_name: Hostname/IP to bind the server to
     """
+    # Imported here so CLI runs don't pay for loading Gradio
+    import gradio as gr
+
     logger = setup_logging(verbose)
-    orchestrator = Orchestrator()
-    chat_history = []
 
-    def chat_fn(message: str, history: List[List[str]]) -> str:
-        """Handle chat messages from Gradio interface.
+    # Open the vector store and catalog shared by all sessions' orchestrators
+    # while the UI is built, so the first session doesn't pay for it
+    executor = ThreadPoolExecutor(max_workers=1)
+    warmup = executor.submit(Orchestrator)
+    executor.shutdown(wait=False)
+
+    # Each browser session gets its own orchestrator (state, cart) and history
+    sessions: Dict[str, Tuple[Orchestrator, List[Dict]]] = {}
+
+    async def chat_fn(
+        message: str, history: List[List[str]], request: gr.Request
+    ) -> AsyncIterator[str]:
+        """Handle chat messages from Gradio interface, streaming the reply.
 
         Args:
             message: User's message
             history: Chat history in Gradio format (ignored - we use our own)
+            request: Gradio request, used to identify the browser session
 
-        Returns:
-            Assistant's response
+        Yields:
+            The assistant's response so far
         """
         if not message.strip():
-            return ""
+            yield ""
+            return
 
         try:
-            logger.debug(f"Orchestrator state: {orchestrator._state.value}")
-            logger.debug(f"Chat history length: {len(chat_history)}")
+            session = sessions.get(request.session_hash)
+            if session is None:
+                # Building an orchestrator blocks, so keep it off the event
+                # loop serving the other sessions
+                orchestrator = await asyncio.to_thread(Orchestrator)
+                session = sessions.setdefault(request.session_hash, (orchestrator, []))
+            orchestrator, chat_history = session
+
+            logger.debug("Orchestrator state: %s", orchestrator._state.value)
+            logger.debug("Chat history length: %s", len(chat_history))
+
+            streamed = ""
+            async for item in orchestrator.astream(message, chat_history=chat_history):
+                if isinstance(item, OrchestratorResponse):
+                    response = item
+                else:
+                    streamed += item
+                    yield streamed
 
-            response = orchestrator.invoke(message, chat_history=chat_history)
             response_message = response.message
 
-            chat_history.append({"role": "user", "content": message})
-            chat_history.append({"role": "assistant", "content": response_message})
+            chat_history.extend(
+                (
+                    {"role": "user", "content": message},
+                    {"role": "assistant", "content": response_message},
+                )
+            )
+            del chat_history[: -2 * MAX_HISTORY_TURNS]
 
-            return response_message
+            yield response_message
 
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error("Error: %s", e)
             if verbose:
                 logger.exception("Full traceback:")
-            return f"❌ Error: {e}\nPlease try again."
+            yield f"❌ Error: {e}\nPlease try again."
+
+    def end_session(request: gr.Request):
+        """Drop a session's orchestrator and history when its browser tab closes."""
+        sessions.pop(request.session_hash, None)
 
     with gr.Blocks(title="🛍️ E-Commerce Shopping Assistant") as demo:
         chatbot = gr.Chatbot(
@@ -182,8 +288,18 @@ def run_web_ui(
             ),
         )
 
-    print(f"\n🚀 Starting web UI on http://{server_name}:{server_port}")
-    print("Press Ctrl+C to stop the server\n")
+        demo.unload(end_session)
+
+    # Surface startup errors (e.g. a missing vector store) before serving
+    warmup.result()
+
+    # Let several sessions wait on the LLM at once instead of queueing behind one
+    demo.queue(default_concurrency_limit=16)
+
+    print(
+        f"\n🚀 Starting web UI on http://{server_name}:{server_port}\n"
+        "Press Ctrl+C to stop the server\n"
+    )
 
     demo.launch(
         server_port=server_port,
@@ -208,6 +324,11 @@ def main(ui: bool = False, verbose: bool = False, port: int = 7860):
 
 
 if __name__ == "__main__":
+    # Banners and replies contain emoji; encode them as UTF-8 regardless of
+    # the terminal's locale instead of failing with UnicodeEncodeError
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.stderr.reconfigure(encoding="utf-8")
+
     parser = argparse.ArgumentParser(
         description="E-commerce chatbot CLI and Web UI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
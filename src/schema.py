@@ -4,19 +4,23 @@ Pydantic models for agent responses and data structures.
 
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 class BaseAgentResponse(BaseModel):
     """Base response class for all agent responses."""
 
+    # Responses are never modified after creation (use model_copy to derive
+    # one), so shared constants like fallback replies can't be mutated
+    model_config = ConfigDict(frozen=True)
+
     message: str = Field(description="Natural language response to the user")
 
 
 class SubAgentResponse(BaseAgentResponse):
     """Base response for sub-agents that can request transfers to other agents."""
 
-    transfer_to_agent: Optional[str] = Field(
+    transfer_to_agent: Optional[Literal["rag", "order"]] = Field(
         None,
         description="Agent to transfer to: 'rag' for product search, 'order' for purchases, or None to continue with current agent",
     )
@@ -25,6 +29,8 @@ class SubAgentResponse(BaseAgentResponse):
 class ProductInfo(BaseModel):
     """Structured product information returned by the agent."""
 
+    model_config = ConfigDict(frozen=True)
+
     product_id: str = Field(description="Unique product identifier")
     name: str = Field(description="Product name")
     description: str = Field(description="Product description")
@@ -33,6 +39,19 @@ class ProductInfo(BaseModel):
     stock_status: str = Field(description="Stock availability status")
 
 
+# Validates a whole list of catalog products in one call
+PRODUCTS_ADAPTER = TypeAdapter(List[ProductInfo])
+
+
+class RAGAgentOutput(SubAgentResponse):
+    """Structured output written by the RAG agent's model."""
+
+    product_ids: List[str] = Field(
+        default_factory=list,
+        description="IDs of the relevant products from the retrieved results",
+    )
+
+
 class RAGResponse(SubAgentResponse):
     """Structured response from the RAG agent."""
 
@@ -41,6 +60,33 @@ class RAGResponse(SubAgentResponse):
     )
 
 
+class OrderItemSummary(BaseModel):
+    """Line item shown in an order summary."""
+
+    model_config = ConfigDict(frozen=True)
+
+    product_id: str = Field(description="Unique product identifier")
+    product_name: str = Field(description="Product name")
+    quantity: int = Field(description="Quantity ordered")
+    unit_price: float = Field(description="Price per unit in dollars")
+
+
+class OrderSummary(BaseModel):
+    """Summary of the cart and customer details awaiting confirmation."""
+
+    model_config = ConfigDict(frozen=True)
+
+    items: List[OrderItemSummary] = Field(
+        default_factory=list, description="Items in the cart"
+    )
+    total: float = Field(description="Order total in dollars")
+    customer_name: Optional[str] = Field(None, description="Customer's full name")
+    email: Optional[str] = Field(None, description="Customer's email address")
+    shipping_address: Optional[str] = Field(
+        None, description="Complete shipping address"
+    )
+
+
 class OrderResponse(SubAgentResponse):
     """Structured response from Order Agent."""
 
@@ -51,7 +97,7 @@ class OrderResponse(SubAgentResponse):
         default_factory=list,
         description="List of missing required fields (e.g., 'quantity', 'email')",
     )
-    order_summary: Optional[dict] = Field(
+    order_summary: Optional[OrderSummary] = Field(
         None, description="Order summary when ready to confirm"
     )
     order_id: Optional[str] = Field(
@@ -33,7 +33,9 @@ class Spinner:
         self.thread.start()
 
     def stop(self):
-        """Stop the spinner."""
+        """Stop the spinner and clear its line (no-op if it isn't running)."""
+        if not self.running:
+            return
         self.running = False
         if self.thread:
             self.thread.join()
@@ -0,0 +1,124 @@
+"""
+Streaming helpers for agents with structured output.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterator, Tuple, Union
+
+from langchain_core.messages import AIMessageChunk
+from langchain_core.utils.json import parse_partial_json
+
+
+class MessageFieldStreamer:
+    """
+    Extracts one string field from structured-output JSON as it streams in.
+
+    The model writes its structured response as a JSON object, so the
+    user-facing text arrives wrapped in JSON. Each chunk is appended to a
+    buffer, the partial JSON is parsed leniently, and only the newly
+    completed part of the field is returned.
+    """
+
+    def __init__(self, field: str = "message"):
+        self.field = field
+        self._buffer = ""
+        self._emitted = 0
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of streamed JSON.
+
+        Args:
+            chunk: Next piece of the model's output
+
+        Returns:
+            Text added to the field by this chunk (empty if none)
+        """
+        self._buffer += chunk
+        try:
+            parsed = parse_partial_json(self._buffer)
+        except ValueError:
+            # Plain text (e.g. a preamble before tool calls) has no field to stream
+            return ""
+        if not isinstance(parsed, dict):
+            return ""
+
+        text = parsed.get(self.field)
+        if not isinstance(text, str) or len(text) <= self._emitted:
+            return ""
+
+        delta = text[self._emitted :]
+        self._emitted = len(text)
+        return delta
+
+
+def _field_delta(
+    streamers: Dict[str, MessageFieldStreamer], data: Tuple, field: str
+) -> str:
+    """Feed one "messages" stream item to the streamer of its model call."""
+    chunk, _ = data
+    if not isinstance(chunk, AIMessageChunk) or not chunk.text:
+        return ""
+
+    # Each model call streams a separate message
+    streamer = streamers.get(chunk.id)
+    if streamer is None:
+        streamer = streamers[chunk.id] = MessageFieldStreamer(field)
+    return streamer.feed(chunk.text)
+
+
+def stream_structured(
+    agent: Any, inputs: Dict, field: str = "message"
+) -> Iterator[Union[str, Dict]]:
+    """
+    Stream the text of a structured response field while the agent runs.
+
+    Args:
+        agent: Agent graph created with create_agent and a response_format
+        inputs: Agent input, e.g. {"messages": [...]}
+        field: Structured response field to stream
+
+    Yields:
+        Text deltas of the field, then the final agent state as a dict
+    """
+    streamers: Dict[str, MessageFieldStreamer] = {}
+    final_state: Dict = {}
+
+    for mode, data in agent.stream(inputs, stream_mode=["messages", "values"]):
+        if mode == "values":
+            final_state = data
+            continue
+
+        delta = _field_delta(streamers, data, field)
+        if delta:
+            yield delta
+
+    yield final_state
+
+
+async def astream_structured(
+    agent: Any, inputs: Dict, field: str = "message"
+) -> AsyncIterator[Union[str, Dict]]:
+    """
+    Async version of stream_structured.
+
+    Args:
+        agent: Agent graph created with create_agent and a response_format
+        inputs: Agent input, e.g. {"messages": [...]}
+        field: Structured response field to stream
+
+    Yields:
+        Text deltas of the field, then the final agent state as a dict
+    """
+    streamers: Dict[str, MessageFieldStreamer] = {}
+    final_state: Dict = {}
+
+    async for mode, data in agent.astream(inputs, stream_mode=["messages", "values"]):
+        if mode == "values":
+            final_state = data
+            continue
+
+        delta = _field_delta(streamers, data, field)
+        if delta:
+            yield delta
+
+    yield final_state
@@ -0,0 +1,67 @@
+"""Tests for the SQLite LLM response cache."""
+
+import pytest
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from database.llm_cache import SQLiteLLMCache
+
+LLM_STRING = "gpt-4o-mini temperature=0"
+
+
+def prompt(*messages):
+    return dumps(list(messages))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteLLMCache(str(tmp_path / "llm_cache.db"))
+
+
+def test_lookup_returns_cached_generations(cache):
+    generations = [ChatGeneration(message=AIMessage(content="Hello!"))]
+    cache.update(prompt(HumanMessage("Hi")), LLM_STRING, generations)
+
+    cached = cache.lookup(prompt(HumanMessage("Hi")), LLM_STRING)
+
+    assert [generation.message.content for generation in cached] == ["Hello!"]
+
+
+def test_lookup_misses_for_different_prompt_or_model(cache):
+    generations = [ChatGeneration(message=AIMessage(content="Hello!"))]
+    cache.update(prompt(HumanMessage("Hi")), LLM_STRING, generations)
+
+    assert cache.lookup(prompt(HumanMessage("Bye")), LLM_STRING) is None
+    assert cache.lookup(prompt(HumanMessage("Hi")), "gpt-4o temperature=0") is None
+
+
+def test_key_ignores_message_ids(cache):
+    generations = [ChatGeneration(message=AIMessage(content="Hello!"))]
+    cache.update(prompt(HumanMessage("Hi", id="run-1")), LLM_STRING, generations)
+
+    assert cache.lookup(prompt(HumanMessage("Hi", id="run-2")), LLM_STRING)
+
+
+def test_key_accepts_non_json_prompt(cache):
+    generations = [ChatGeneration(message=AIMessage(content="Hello!"))]
+    cache.update("plain prompt", LLM_STRING, generations)
+
+    assert cache.lookup("plain prompt", LLM_STRING)
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    generations = [ChatGeneration(message=AIMessage(content="Hello!"))]
+    SQLiteLLMCache(path).update(prompt(HumanMessage("Hi")), LLM_STRING, generations)
+
+    assert SQLiteLLMCache(path).lookup(prompt(HumanMessage("Hi")), LLM_STRING)
+
+
+def test_clear_removes_entries(cache):
+    generations = [ChatGeneration(message=AIMessage(content="Hello!"))]
+    cache.update(prompt(HumanMessage("Hi")), LLM_STRING, generations)
+
+    cache.clear()
+
+    assert cache.lookup(prompt(HumanMessage("Hi")), LLM_STRING) is None
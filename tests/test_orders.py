@@ -0,0 +1,156 @@
+"""Tests for the order database."""
+
+import sqlite3
+import time
+from datetime import timedelta
+
+import pytest
+
+from database.orders import OrderDatabase
+
+# Schema written by earlier versions, without column defaults for timestamps
+_LEGACY_SCHEMA = """
+CREATE TABLE orders (
+    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    order_id VARCHAR NOT NULL UNIQUE,
+    customer_name VARCHAR NOT NULL,
+    customer_email VARCHAR NOT NULL,
+    total_amount FLOAT NOT NULL,
+    status VARCHAR NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME
+);
+CREATE TABLE order_items (
+    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    order_id VARCHAR NOT NULL REFERENCES orders(order_id),
+    product_id VARCHAR NOT NULL,
+    product_name VARCHAR NOT NULL,
+    quantity INTEGER NOT NULL,
+    unit_price FLOAT NOT NULL,
+    subtotal FLOAT NOT NULL
+);
+"""
+
+ITEMS = [
+    {
+        "product_id": "TECH-001",
+        "product_name": "MacBook Pro",
+        "quantity": 2,
+        "unit_price": 2499.99,
+    }
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    return OrderDatabase(str(tmp_path / "orders.db"))
+
+
+def test_create_order_sets_timestamps(db):
+    order = db.create_order("Jane Doe", "jane@example.com", ITEMS)
+
+    assert order.created_at is not None
+    assert order.updated_at == order.created_at
+    assert db.get_order_by_id(order.order_id).created_at == order.created_at
+
+
+def test_timestamps_have_sub_second_resolution(db):
+    first = db.create_order("Jane Doe", "jane@example.com", ITEMS)
+    time.sleep(0.01)
+    second = db.create_order("Jane Doe", "jane@example.com", ITEMS)
+
+    assert second.created_at > first.created_at
+    assert second.created_at - first.created_at < timedelta(seconds=1)
+
+
+def test_update_order_status_refreshes_updated_at(db):
+    order = db.create_order("Jane Doe", "jane@example.com", ITEMS)
+    time.sleep(0.01)
+
+    updated = db.update_order_status(order.order_id, "shipped")
+
+    assert updated.status == "shipped"
+    assert updated.created_at == order.created_at
+    assert updated.updated_at > order.updated_at
+
+
+def test_table_default_fills_created_at(db):
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO orders (order_id, customer_name, customer_email,"
+            " total_amount, status) VALUES ('ORD-RAW', 'Jane', 'jane@example.com',"
+            " 1.0, 'pending')"
+        )
+
+    assert db.get_order_by_id("ORD-RAW").created_at is not None
+
+
+def test_create_order_on_legacy_schema(tmp_path):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(_LEGACY_SCHEMA)
+
+    db = OrderDatabase(str(path))
+    order = db.create_order("Jane Doe", "jane@example.com", ITEMS)
+
+    assert db.get_order_by_id(order.order_id).created_at is not None
+
+
+def test_get_orders_by_email_returns_newest_first(db):
+    order_ids = [
+        db.create_order("Jane Doe", "jane@example.com", ITEMS).order_id
+        for _ in range(3)
+    ]
+    db.create_order("John Doe", "john@example.com", ITEMS)
+
+    orders = db.get_orders_by_email("jane@example.com")
+
+    assert [order.order_id for order in orders] == order_ids[::-1]
+
+
+def _insert_order(db, order_id, created_at):
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO orders (order_id, customer_name, customer_email,"
+            " total_amount, status, created_at) VALUES (?, 'Jane',"
+            " 'jane@example.com', 1.0, 'pending', ?)",
+            (order_id, created_at),
+        )
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 200])
+def test_iter_orders_pages_newest_first(db, page_size):
+    order_ids = [
+        db.create_order("Jane Doe", "jane@example.com", ITEMS).order_id
+        for _ in range(5)
+    ]
+
+    orders = list(db.iter_orders(page_size=page_size))
+
+    assert [order.order_id for order in orders] == order_ids[::-1]
+    assert all(len(order.items) == 1 for order in orders)
+
+
+def test_iter_orders_breaks_timestamp_ties_by_id(db):
+    for order_id in ["ORD-A", "ORD-B", "ORD-C"]:
+        _insert_order(db, order_id, "2024-01-01 12:00:00.000")
+
+    orders = list(db.iter_orders(page_size=2))
+
+    assert [order.order_id for order in orders] == ["ORD-C", "ORD-B", "ORD-A"]
+
+
+def test_iter_orders_handles_mixed_precision(db):
+    # Rows written before timestamps moved into SQLite have microseconds
+    _insert_order(db, "ORD-OLD-1", "2024-01-01 12:00:00.250000")
+    _insert_order(db, "ORD-NEW-1", "2024-01-01 12:00:00.500")
+    _insert_order(db, "ORD-OLD-2", "2024-01-01 12:00:00.500000")
+    _insert_order(db, "ORD-NEW-2", "2024-01-01 12:00:00.750")
+
+    order_ids = [order.order_id for order in db.iter_orders(page_size=1)]
+
+    assert order_ids == ["ORD-NEW-2", "ORD-OLD-2", "ORD-NEW-1", "ORD-OLD-1"]
+
+
+def test_iter_orders_empty(db):
+    assert list(db.iter_orders()) == []
@@ -0,0 +1,116 @@
+"""Tests for the semantic response cache."""
+
+import uuid
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from database import semantic_cache
+from database.semantic_cache import SemanticCache
+
+
+class FakeEmbeddings(Embeddings):
+    """Embeds texts to fixed vectors, defaulting to one shared direction."""
+
+    def __init__(self, vectors=None):
+        self.vectors = vectors or {}
+
+    def embed_query(self, text):
+        return self.vectors.get(text, [1.0, 0.0, 0.0])
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def make_cache():
+    def make(embeddings=None, **kwargs):
+        # The in-process Chroma system is shared, so isolate each cache
+        return SemanticCache(
+            embeddings or FakeEmbeddings(),
+            collection_name=f"test-{uuid.uuid4().hex}",
+            **kwargs,
+        )
+
+    return make
+
+
+def test_lookup_returns_response_of_similar_query(make_cache):
+    cache = make_cache()
+    cache.store("what laptops do you have", "laptops")
+
+    assert cache.lookup("show me laptops") == "laptops"
+
+
+def test_lookup_misses_beyond_distance_threshold(make_cache):
+    cache = make_cache(FakeEmbeddings({"headphones": [0.0, 1.0, 0.0]}))
+    cache.store("laptops", "laptops")
+
+    assert cache.lookup("headphones") is None
+
+
+def test_lookup_requires_same_product_ids(make_cache):
+    cache = make_cache()
+    cache.store("price of TECH-001", "TECH-001 costs $2499.99")
+
+    assert cache.lookup("price of TECH-002") is None
+    assert cache.lookup("What's the price of tech-001?") == "TECH-001 costs $2499.99"
+
+
+def test_lookup_requires_same_numbers(make_cache):
+    cache = make_cache()
+    cache.store("laptops under $500", "cheap laptops")
+    cache.store("laptops", "all laptops")
+
+    assert cache.lookup("laptops under $800") is None
+    assert cache.lookup("laptops under 500 dollars") == "cheap laptops"
+    assert cache.lookup("show laptops") == "all laptops"
+
+
+def test_key_tokens_are_normalized():
+    assert (
+        SemanticCache._key_tokens("2 of TECH-001 for $1,000.50, not TECH-001")
+        == "1000.50 2 tech-001"
+    )
+    assert SemanticCache._key_tokens("show me laptops") == ""
+
+
+def test_lookup_applies_metadata_filter(make_cache):
+    cache = make_cache()
+    cache.store("show laptops", "intent answer", {"state": "intent"})
+
+    assert cache.lookup("show laptops", where={"state": "intent"}) == "intent answer"
+    assert cache.lookup("show laptops", where={"state": "checkout"}) is None
+
+
+def test_lookup_ignores_entries_older_than_max_age(make_cache, monkeypatch):
+    cache = make_cache(max_age=60)
+    now = 1_000_000.0
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: now)
+    cache.store("show laptops", "laptops")
+
+    now += 59
+    assert cache.lookup("show laptops") == "laptops"
+
+    now += 2
+    assert cache.lookup("show laptops") is None
+
+
+def test_store_evicts_oldest_entries(make_cache, monkeypatch):
+    embeddings = FakeEmbeddings(
+        {
+            "first": [1.0, 0.0, 0.0],
+            "second": [0.0, 1.0, 0.0],
+            "third": [0.0, 0.0, 1.0],
+        }
+    )
+    cache = make_cache(embeddings, max_entries=2)
+    clock = iter(range(100))
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: float(next(clock)))
+
+    for query in ("first", "second", "third"):
+        cache.store(query, query)
+
+    assert cache.lookup("first") is None
+    assert cache.lookup("second") == "second"
+    assert cache.lookup("third") == "third"
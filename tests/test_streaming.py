@@ -0,0 +1,100 @@
+"""Tests for streaming structured-output fields."""
+
+import asyncio
+
+from langchain_core.messages import AIMessageChunk
+
+from utils.streaming import (
+    MessageFieldStreamer,
+    astream_structured,
+    stream_structured,
+)
+
+
+class FakeAgent:
+    """Agent stub replaying a fixed stream of (mode, data) items."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def stream(self, inputs, stream_mode):
+        yield from self.items
+
+    async def astream(self, inputs, stream_mode):
+        for item in self.items:
+            yield item
+
+
+def _message(chunk_id: str, text: str):
+    return ("messages", (AIMessageChunk(content=text, id=chunk_id), {}))
+
+
+def test_feed_emits_only_new_field_text():
+    streamer = MessageFieldStreamer()
+
+    deltas = [
+        streamer.feed(chunk)
+        for chunk in ['{"mess', 'age": "Hel', "lo wor", 'ld", "agent_used": "rag"}']
+    ]
+
+    assert "".join(deltas) == "Hello world"
+    assert deltas[0] == ""
+
+
+def test_feed_ignores_non_json_chunks():
+    streamer = MessageFieldStreamer()
+
+    assert streamer.feed(" ") == ""
+    assert streamer.feed("Let me") == ""
+
+
+def test_feed_streams_json_after_non_json_chunks():
+    # Each model call gets its own streamer, so a preamble never shares a
+    # buffer with the structured response
+    preamble = MessageFieldStreamer()
+    assert preamble.feed("Let me check that.") == ""
+
+    streamer = MessageFieldStreamer()
+    assert streamer.feed(" ") == ""
+    assert streamer.feed('{"message": "Hi"}') == "Hi"
+
+
+def test_feed_ignores_other_fields():
+    streamer = MessageFieldStreamer()
+
+    assert streamer.feed('{"agent_used": "rag", "message": ') == ""
+    assert streamer.feed('"ok"}') == "ok"
+
+
+def test_stream_structured_skips_preamble_and_returns_final_state():
+    final_state = {"structured_response": "done"}
+    agent = FakeAgent(
+        [
+            _message("call-1", "Let me"),
+            _message("call-1", " search."),
+            _message("call-2", '{"message": "Found '),
+            _message("call-2", '2 laptops"}'),
+            ("values", final_state),
+        ]
+    )
+
+    items = list(stream_structured(agent, {"messages": []}))
+
+    assert items == ["Found ", "2 laptops", final_state]
+
+
+def test_astream_structured_matches_sync_version():
+    final_state = {"structured_response": "done"}
+    agent = FakeAgent(
+        [
+            _message("call-1", " "),
+            _message("call-2", '{"message": "Hi'),
+            _message("call-2", ' there"}'),
+            ("values", final_state),
+        ]
+    )
+
+    async def collect():
+        return [item async for item in astream_structured(agent, {"messages": []})]
+
+    assert asyncio.run(collect()) == ["Hi", " there", final_state]